@@ -4,37 +4,133 @@ Advanced Analytics Dashboard with ML Insights
 """
 import sys
 import os
+import time
+import queue
+import itertools
+import functools
+from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTabWidget, QTextEdit, QLabel, 
                              QPushButton, QScrollArea, QFrame, QGridLayout,
-                             QProgressBar, QComboBox, QMessageBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QPixmap, QPainter, QColor
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import seaborn as sns
-import pandas as pd
-import numpy as np
+                             QProgressBar, QComboBox, QMessageBox, QCheckBox)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QFont
 from core.ml_analytics import ml_analytics
 from core.analytics import analytics_engine
 import json
+import hashlib
+import tempfile
+
+try:
+    import orjson  # Optional C-extension serializer, ~5-10x faster than json
+except ImportError:
+    orjson = None
+
+# Disk cache for ML insights, invalidated whenever the analytics DB changes
+INSIGHTS_CACHE_DIR = os.path.join("data", "insights_cache")
+
+def _db_signature():
+    """(MAX(rowid), COUNT(*)) of query_metrics - changes with the data
+
+    File stat is no invalidation key under WAL journaling: new commits
+    land in the -wal file and the main DB's mtime and size stay
+    byte-identical until a checkpoint. The indexed aggregate matches how
+    ml_analytics keys its own insight cache.
+    """
+    try:
+        with analytics_engine.cursor() as cursor:
+            cursor.row_factory = None
+            return cursor.execute('SELECT MAX(rowid), COUNT(*) FROM query_metrics').fetchone()
+    except Exception:
+        return None
+
+def _insights_cache_path(days: int, signature):
+    """Cache file path keyed by (days, data signature), or None if no DB"""
+    if signature is None:
+        return None
+    key = f"{days}_{signature[0]}_{signature[1]}"
+    digest = hashlib.md5(key.encode()).hexdigest()
+    return os.path.join(INSIGHTS_CACHE_DIR, f"insights_{digest}.json")
+
+@functools.lru_cache(maxsize=4)
+def _cached_insights(days: int, cache_buster) -> dict:
+    """In-memory LRU over the ML pipeline.
+
+    The days combo only offers a handful of values, so repeats are common
+    within a session; cache_buster carries the data signature so new rows
+    invalidate automatically.
+    """
+    return ml_analytics.get_query_insights(days)
 
 class AnalyticsWorker(QThread):
-    """Background worker for ML analytics computation"""
-    insights_ready = pyqtSignal(dict)
+    """Persistent background worker fed by a latest-wins request queue"""
+    perf_ready = pyqtSignal(int, dict)      # (days, perf) - cheap DB aggregates
+    insights_ready = pyqtSignal(int, dict)  # (days, insights) - full ML output
     error_occurred = pyqtSignal(str)
-    
-    def __init__(self, days=30):
+
+    _STOP = object()
+
+    def __init__(self):
         super().__init__()
-        self.days = days
-    
+        self._queue = queue.Queue()
+
+    def request(self, days, force=False):
+        """Enqueue a refresh, dropping any not-yet-started request"""
+        self._drain()
+        self._queue.put((days, force))
+
+    def stop(self):
+        """Ask the worker loop to exit after the current task"""
+        self._drain()
+        self._queue.put(self._STOP)
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
     def run(self):
-        try:
-            insights = ml_analytics.get_query_insights(self.days)
-            self.insights_ready.emit(insights)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+        ml_analytics._warmup()  # JIT-compile kernels off the GUI thread
+        while True:
+            task = self._queue.get()
+            if task is self._STOP:
+                return
+            days, force = task
+            try:
+                perf_data = analytics_engine.get_dashboard_bundle(days)
+                self.perf_ready.emit(days, perf_data)
+                self.insights_ready.emit(days, self._get_insights(days, force))
+            except Exception as e:
+                self.error_occurred.emit(str(e))
+
+    def _get_insights(self, days, force) -> dict:
+        """Load ML insights from the caches, recomputing when the DB changed"""
+        cache_buster = _db_signature()
+        cache_path = _insights_cache_path(days, cache_buster)
+        if cache_path and not force and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass  # Stale or corrupt cache - recompute below
+
+        if force:
+            _cached_insights.cache_clear()
+        insights = _cached_insights(days, cache_buster)
+
+        if cache_path:
+            try:
+                os.makedirs(INSIGHTS_CACHE_DIR, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=INSIGHTS_CACHE_DIR, suffix='.json')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(insights, f, default=str)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # Cache write failures never block the refresh
+
+        return insights
 
 class InsightCard(QFrame):
     """Card widget for displaying insights"""
@@ -72,71 +168,105 @@ class InsightCard(QFrame):
 
 class ChartWidget(QWidget):
     """Widget for displaying matplotlib charts"""
-    
+
+    PERF_METRICS = ('avg_response_time', 'avg_rating', 'success_rate')
+    SENTIMENT_LABELS = ('Positive', 'Neutral', 'Negative')
+
     def __init__(self):
         super().__init__()
+        # Deferred so the dashboard window appears before matplotlib loads
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
         self.figure = Figure(figsize=(10, 6))
         self.canvas = FigureCanvas(self.figure)
-        
+
         layout = QVBoxLayout(self)
         layout.addWidget(self.canvas)
-    
-    def plot_performance_trends(self, insights: dict):
-        """Plot performance trends"""
-        self.figure.clear()
-        
-        # Get performance data
-        perf_data = analytics_engine.get_performance_insights(30)
-        
+
+        self._init_plots()
+
+    def _init_plots(self):
+        """Create the four axes and their bar artists once, up front"""
+        axes = self.figure.subplots(2, 2)
+        (self.perf_ax, self.cluster_ax), (self.sentiment_ax, self.bottleneck_ax) = axes
+
+        self._perf_bars = self.perf_ax.bar(
+            self.PERF_METRICS, [0, 0, 0], color=['#ff6b6b', '#4ecdc4', '#45b7d1']
+        )
+        self.perf_ax.set_title('Performance Overview')
+        self.perf_ax.tick_params(axis='x', rotation=45)
+
+        self.cluster_ax.set_title('Question Categories')
+
+        self._sentiment_bars = self.sentiment_ax.bar(
+            self.SENTIMENT_LABELS, [0, 0, 0], color=['#28a745', '#ffc107', '#dc3545']
+        )
+        self.sentiment_ax.set_title('Response Sentiment')
+
+        self.bottleneck_ax.set_title('Performance Bottlenecks')
+
+        self.figure.tight_layout()
+
+    @staticmethod
+    def _update_bars(ax, bars, values):
+        """Set new bar heights in place and rescale the y axis"""
+        for bar, value in zip(bars, values):
+            bar.set_height(value)
+        upper = max(values) if values else 0
+        ax.set_ylim(0, upper * 1.1 if upper > 0 else 1)
+
+    def plot_performance_trends(self, insights: dict, perf_data: dict):
+        """Plot performance trends by updating the existing artists"""
+        import numpy as np  # Already loaded as a matplotlib dependency
+
         if 'performance' in perf_data:
-            ax = self.figure.add_subplot(2, 2, 1)
-            metrics = ['avg_response_time', 'avg_rating', 'success_rate']
-            values = [perf_data['performance'].get(m, 0) for m in metrics]
-            
-            ax.bar(metrics, values, color=['#ff6b6b', '#4ecdc4', '#45b7d1'])
-            ax.set_title('Performance Overview')
-            ax.tick_params(axis='x', rotation=45)
-        
-        # Question patterns
+            values = [perf_data['performance'].get(m, 0) for m in self.PERF_METRICS]
+            self._update_bars(self.perf_ax, self._perf_bars, values)
+
+        # Question patterns (pie charts have no efficient in-place update,
+        # so only this axes is rebuilt per refresh)
         if 'question_patterns' in insights and 'clusters' in insights['question_patterns']:
-            ax = self.figure.add_subplot(2, 2, 2)
             clusters = insights['question_patterns']['clusters']
-            
+
             cluster_names = list(clusters.keys())
-            cluster_sizes = [clusters[c]['size'] for c in cluster_names]
-            
-            ax.pie(cluster_sizes, labels=cluster_names, autopct='%1.1f%%')
-            ax.set_title('Question Categories')
-        
+            cluster_sizes = np.fromiter(
+                (c['size'] for c in clusters.values()),
+                dtype=np.int32, count=len(clusters)
+            )
+
+            self.cluster_ax.clear()
+            self.cluster_ax.pie(cluster_sizes, labels=cluster_names, autopct='%1.1f%%')
+            self.cluster_ax.set_title('Question Categories')
+
         # Response quality
         if 'response_quality' in insights:
-            ax = self.figure.add_subplot(2, 2, 3)
             quality = insights['response_quality']
-            
+
             if 'sentiment_stats' in quality:
                 sentiment_data = quality['sentiment_stats']
-                labels = ['Positive', 'Neutral', 'Negative']
-                pos_ratio = sentiment_data.get('positive_ratio', 0)
-                values = [pos_ratio, 1 - pos_ratio - 0.1, 0.1]  # Simplified
-                
-                ax.bar(labels, values, color=['#28a745', '#ffc107', '#dc3545'])
-                ax.set_title('Response Sentiment')
-        
-        # Performance bottlenecks
+                values = [sentiment_data.get(key, 0) for key in
+                          ('positive_ratio', 'neutral_ratio', 'negative_ratio')]
+                self._update_bars(self.sentiment_ax, self._sentiment_bars, values)
+
+        # Performance bottlenecks (category set varies per refresh, so this
+        # axes is rebuilt as well)
         if 'performance_bottlenecks' in insights:
-            ax = self.figure.add_subplot(2, 2, 4)
             bottlenecks = insights['performance_bottlenecks'].get('bottlenecks', [])
-            
+
             if bottlenecks:
                 types = [b['type'] for b in bottlenecks]
-                counts = [b['count'] for b in bottlenecks]
-                
-                ax.bar(types, counts, color='#ff6b6b')
-                ax.set_title('Performance Bottlenecks')
-                ax.tick_params(axis='x', rotation=45)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+                counts = np.fromiter(
+                    (b['count'] for b in bottlenecks),
+                    dtype=np.int32, count=len(bottlenecks)
+                )
+
+                self.bottleneck_ax.clear()
+                self.bottleneck_ax.bar(types, counts, color='#ff6b6b')
+                self.bottleneck_ax.set_title('Performance Bottlenecks')
+                self.bottleneck_ax.tick_params(axis='x', rotation=45)
+
+        self.canvas.draw_idle()
 
 class AnalyticsDashboard(QMainWindow):
     """Main analytics dashboard window"""
@@ -146,6 +276,8 @@ class AnalyticsDashboard(QMainWindow):
         self.setWindowTitle("RAG Analytics Dashboard - ML Insights")
         self.setGeometry(100, 100, 1400, 900)
         self.insights_data = {}
+        self._perf_cache = {}  # days -> (fetch_time, perf_data)
+        self._last_insights_hash = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -186,7 +318,11 @@ class AnalyticsDashboard(QMainWindow):
             }
         """)
         controls_layout.addWidget(self.refresh_btn)
-        
+
+        self.force_recompute_cb = QCheckBox("Force recompute")
+        self.force_recompute_cb.setToolTip("Bypass the cached insights and rerun the ML analysis")
+        controls_layout.addWidget(self.force_recompute_cb)
+
         self.export_btn = QPushButton("📊 Export Report")
         self.export_btn.clicked.connect(self.export_report)
         self.export_btn.setStyleSheet("""
@@ -222,21 +358,15 @@ class AnalyticsDashboard(QMainWindow):
         self.create_recommendations_tab()
         self.create_charts_tab()
         
-        # Load basic metrics immediately on startup
-        QTimer.singleShot(100, self.load_basic_metrics)
-        # Auto-refresh full analytics after basic metrics
-        QTimer.singleShot(1500, self.refresh_analytics)
-    
-    def load_basic_metrics(self):
-        """Load basic metrics immediately without ML processing"""
-        print("[DEBUG] load_basic_metrics called")
-        try:
-            self.update_overview_metrics()
-        except Exception as e:
-            print(f"[ERROR] Error loading basic metrics: {e}")
-            import traceback
-            traceback.print_exc()
-    
+        # One long-lived worker serves all refreshes; the startup request
+        # covers both the quick overview metrics and the full ML insights
+        self.worker = AnalyticsWorker()
+        self.worker.perf_ready.connect(self.on_perf_ready)
+        self.worker.insights_ready.connect(self.on_insights_ready)
+        self.worker.error_occurred.connect(self.on_error)
+        self.worker.start()
+        self.refresh_analytics()
+
     def create_overview_tab(self):
         """Create overview tab with key metrics"""
         tab = QWidget()
@@ -275,7 +405,21 @@ class AnalyticsDashboard(QMainWindow):
         scroll_area = QScrollArea()
         scroll_widget = QWidget()
         self.insights_layout = QVBoxLayout(scroll_widget)
-        
+
+        # Fixed pool of cards reused across refreshes instead of destroying
+        # and recreating widgets (and re-parsing stylesheets) each time
+        self._cards = {
+            'error': InsightCard("Error", "", "#ffebee"),
+            'pattern': InsightCard("🔍 Question Pattern Analysis", "", "#e3f2fd"),
+            'quality': InsightCard("📝 Response Quality Insights", "", "#f3e5f5"),
+            'bottleneck': InsightCard("⚡ Performance Bottlenecks", "", "#fff3e0"),
+            'satisfaction': InsightCard("😊 User Satisfaction Patterns", "", "#e8f5e8"),
+        }
+        for card in self._cards.values():
+            card.setVisible(False)
+            self.insights_layout.addWidget(card)
+        self.insights_layout.addStretch()
+
         scroll_area.setWidget(scroll_widget)
         scroll_area.setWidgetResizable(True)
         layout.addWidget(scroll_area)
@@ -294,21 +438,41 @@ class AnalyticsDashboard(QMainWindow):
         self.tab_widget.addTab(tab, "💡 Recommendations")
     
     def create_charts_tab(self):
-        """Create charts tab"""
+        """Create charts tab (chart widget is built lazily on first visit)"""
         tab = QWidget()
-        layout = QVBoxLayout(tab)
-        
-        self.chart_widget = ChartWidget()
-        layout.addWidget(self.chart_widget)
-        
-        self.tab_widget.addTab(tab, "📈 Charts")
+        self.charts_layout = QVBoxLayout(tab)
+
+        self.chart_widget = None
+        self._pending_chart_data = None
+
+        self.charts_tab_index = self.tab_widget.addTab(tab, "📈 Charts")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+
+    def on_tab_changed(self, index):
+        """Instantiate the chart widget (and matplotlib) on first Charts visit"""
+        if index == self.charts_tab_index and self.chart_widget is None:
+            self.chart_widget = ChartWidget()
+            self.charts_layout.addWidget(self.chart_widget)
+            if self._pending_chart_data is not None:
+                self.chart_widget.plot_performance_trends(*self._pending_chart_data)
+                self._pending_chart_data = None
     
-    def update_overview_metrics(self):
+    def _get_perf(self, days: int) -> dict:
+        """Get performance insights, cached briefly so tabs share one DB fetch"""
+        cached = self._perf_cache.get(days)
+        if cached and time.time() - cached[0] < 5.0:
+            return cached[1]
+        perf_data = analytics_engine.get_dashboard_bundle(days)
+        self._perf_cache[days] = (time.time(), perf_data)
+        return perf_data
+
+    def update_overview_metrics(self, perf_data=None):
         """Update overview tab with basic performance metrics"""
         print("[DEBUG] update_overview_metrics called")
         try:
-            # Get performance data directly from analytics engine
-            perf_data = analytics_engine.get_performance_insights(30)
+            # Get performance data from the shared cache
+            if perf_data is None:
+                perf_data = self._get_perf(30)
             print(f"[DEBUG] Got performance data: {perf_data.get('performance', {}).get('total_queries', 'NO DATA')} queries")
             
             if 'performance' in perf_data:
@@ -331,8 +495,8 @@ class AnalyticsDashboard(QMainWindow):
                 success_rate = perf.get('success_rate', 0)
                 self.success_rate_card.update_content(f"{success_rate*100:.1f}%")
                 
-                # Update activity text
-                activity_text = f"""Performance Summary (Last 30 days):
+                # Update activity text (single join, no repeated str reallocation)
+                header = f"""Performance Summary (Last 30 days):
 
 - Total Queries: {int(perf.get('total_queries', 0))}
 - Average Response Time: {perf.get('avg_response_time', 0):.2f}s
@@ -343,19 +507,24 @@ class AnalyticsDashboard(QMainWindow):
 - Average Rating: {perf.get('avg_rating', 0):.1f}/5.0
 
 Document Usage:"""
-                
-                if 'document_stats' in perf_data:
-                    for doc_stat in perf_data['document_stats'][:5]:
-                        filename, usage_count, chunk_count, avg_chunk_size = doc_stat
-                        activity_text += f"\n- {filename}: {usage_count} uses, {chunk_count} chunks"
-                
-                if 'failing_queries' in perf_data and perf_data['failing_queries']:
-                    activity_text += "\n\n[!] Low-rated queries:"
-                    for query_data in perf_data['failing_queries'][:3]:
-                        question, rating, count = query_data
-                        activity_text += f"\n- '{question}' - {rating}/5 ({count} times)"
-                
-                self.activity_text.setPlainText(activity_text)
+
+                doc_lines = [
+                    f"\n- {filename}: {usage_count} uses, {chunk_count} chunks"
+                    for filename, usage_count, chunk_count, _ in perf_data.get('document_stats', [])[:5]
+                ]
+                fail_lines = [
+                    f"\n- '{question}' - {rating}/5 ({count} times)"
+                    for question, rating, count in perf_data.get('failing_queries', [])[:3]
+                ]
+                if fail_lines:
+                    fail_lines.insert(0, "\n\n[!] Low-rated queries:")
+
+                # Suppress paint events while the document is replaced
+                self.activity_text.setUpdatesEnabled(False)
+                try:
+                    self.activity_text.setPlainText("".join([header] + doc_lines + fail_lines))
+                finally:
+                    self.activity_text.setUpdatesEnabled(True)
             
         except Exception as e:
             error_msg = f"Error loading metrics: {str(e)}"
@@ -368,23 +537,36 @@ Document Usage:"""
         """Refresh analytics data"""
         days_text = self.days_combo.currentText()
         days = int(days_text.split()[0])
-        
+
+        self._perf_cache.clear()
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate
         self.refresh_btn.setEnabled(False)
         
-        # Start background worker
-        self.worker = AnalyticsWorker(days)
-        self.worker.insights_ready.connect(self.on_insights_ready)
-        self.worker.error_occurred.connect(self.on_error)
-        self.worker.start()
-    
-    def on_insights_ready(self, insights):
-        """Handle insights data"""
-        self.insights_data = insights
-        self.update_overview_metrics()  # Update overview first
-        self.update_ui_with_insights(insights)
-        
+        # Hand the request to the persistent worker (latest request wins)
+        self.worker.request(days, force=self.force_recompute_cb.isChecked())
+
+    def on_perf_ready(self, days, perf_data):
+        """Show the cheap overview metrics as soon as they are available"""
+        self._perf_cache[days] = (time.time(), perf_data)
+        self.update_overview_metrics(perf_data)
+
+    def on_insights_ready(self, days, insights):
+        """Handle the full ML insights computed by the background worker"""
+        # Skip the full card/chart rebuild when nothing actually changed
+        # (e.g. a refresh served entirely from cache)
+        # OPT_NON_STR_KEYS: satisfaction_distribution and the cluster
+        # maps use int dict keys, which orjson rejects by default
+        payload = (orjson.dumps(insights, default=str, option=orjson.OPT_NON_STR_KEYS)
+                   if orjson is not None
+                   else json.dumps(insights, default=str).encode())
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
+        if digest != self._last_insights_hash:
+            self._last_insights_hash = digest
+            self.insights_data = insights
+            perf_data = self._get_perf(days)
+            self.update_ui_with_insights(insights, perf_data)
+
         self.progress_bar.setVisible(False)
         self.refresh_btn.setEnabled(True)
     
@@ -394,110 +576,124 @@ Document Usage:"""
         self.progress_bar.setVisible(False)
         self.refresh_btn.setEnabled(True)
     
-    def update_ui_with_insights(self, insights):
+    def _show_card(self, key, content):
+        """Fill a pooled insight card and make it visible"""
+        card = self._cards[key]
+        card.update_content(content)
+        card.setVisible(True)
+
+    def update_ui_with_insights(self, insights, perf_data=None):
         """Update UI with ML insights"""
-        # Clear previous insights
-        for i in reversed(range(self.insights_layout.count())):
-            self.insights_layout.itemAt(i).widget().setParent(None)
-        
-        # Add new insights
-        if 'error' in insights:
-            self.insights_layout.addWidget(
-                InsightCard("Error", insights['error'], "#ffebee")
-            )
-            return
-        
-        # Question patterns
-        if 'question_patterns' in insights:
-            patterns = insights['question_patterns']
-            if 'clusters' in patterns:
-                content = f"Found {len(patterns['clusters'])} question categories:\n"
-                for cluster_id, data in patterns['clusters'].items():
-                    content += f"• {cluster_id}: {data['size']} questions, keywords: {', '.join(data['keywords'][:3])}\n"
-                
-                self.insights_layout.addWidget(
-                    InsightCard("🔍 Question Pattern Analysis", content, "#e3f2fd")
-                )
-        
-        # Response quality
-        if 'response_quality' in insights:
-            quality = insights['response_quality']
-            content = "Response Quality Analysis:\n"
-            
-            if 'sentiment_stats' in quality:
-                sentiment = quality['sentiment_stats']
-                content += f"• Average sentiment: {sentiment.get('avg_sentiment', 0):.2f}\n"
-                content += f"• Positive responses: {sentiment.get('positive_ratio', 0)*100:.1f}%\n"
-            
-            if 'improvement_suggestions' in quality:
-                content += f"• Suggestions: {', '.join(quality['improvement_suggestions'])}\n"
-            
-            self.insights_layout.addWidget(
-                InsightCard("📝 Response Quality Insights", content, "#f3e5f5")
-            )
-        
-        # Performance bottlenecks
-        if 'performance_bottlenecks' in insights:
-            bottlenecks = insights['performance_bottlenecks']
-            content = "Performance Analysis:\n"
-            
-            if 'bottlenecks' in bottlenecks:
-                for bottleneck in bottlenecks['bottlenecks']:
-                    content += f"• {bottleneck['type']}: {bottleneck['count']} instances\n"
-            
-            if 'optimization_recommendations' in bottlenecks:
-                content += f"\nOptimizations:\n"
-                for rec in bottlenecks['optimization_recommendations']:
-                    content += f"• {rec}\n"
-            
-            self.insights_layout.addWidget(
-                InsightCard("⚡ Performance Bottlenecks", content, "#fff3e0")
-            )
-        
-        # Satisfaction patterns
-        if 'satisfaction_patterns' in insights:
-            satisfaction = insights['satisfaction_patterns']
-            content = f"User Satisfaction Analysis:\n"
-            content += f"• Overall satisfaction: {satisfaction.get('overall_satisfaction', 0):.1f}/5\n"
-            
-            if 'satisfaction_by_type' in satisfaction:
-                content += "• By question type:\n"
-                for qtype, rating in satisfaction['satisfaction_by_type'].items():
-                    content += f"  - {qtype}: {rating:.1f}/5\n"
-            
-            self.insights_layout.addWidget(
-                InsightCard("😊 User Satisfaction Patterns", content, "#e8f5e8")
-            )
-        
+        if perf_data is None:
+            perf_data = self._get_perf(30)
+        # One repaint for the whole tab instead of one per card
+        insights_widget = self.insights_layout.parentWidget()
+        insights_widget.setUpdatesEnabled(False)
+        try:
+            # Reuse the preallocated cards; hide sections that have no data
+            for card in self._cards.values():
+                card.setVisible(False)
+
+            if 'error' in insights:
+                self._show_card('error', insights['error'])
+                return
+
+            # Question patterns
+            if 'question_patterns' in insights:
+                patterns = insights['question_patterns']
+                if 'clusters' in patterns:
+                    content = f"Found {len(patterns['clusters'])} question categories:\n"
+                    for cluster_id, data in patterns['clusters'].items():
+                        content += f"• {cluster_id}: {data['size']} questions, keywords: {', '.join(data['keywords'][:3])}\n"
+
+                    self._show_card('pattern', content)
+
+            # Response quality
+            if 'response_quality' in insights:
+                quality = insights['response_quality']
+                content = "Response Quality Analysis:\n"
+
+                if 'sentiment_stats' in quality:
+                    sentiment = quality['sentiment_stats']
+                    content += f"• Average sentiment: {sentiment.get('avg_sentiment', 0):.2f}\n"
+                    content += f"• Positive responses: {sentiment.get('positive_ratio', 0)*100:.1f}%\n"
+
+                if 'improvement_suggestions' in quality:
+                    content += f"• Suggestions: {', '.join(quality['improvement_suggestions'])}\n"
+
+                self._show_card('quality', content)
+
+            # Performance bottlenecks
+            if 'performance_bottlenecks' in insights:
+                bottlenecks = insights['performance_bottlenecks']
+                content = "Performance Analysis:\n"
+
+                if 'bottlenecks' in bottlenecks:
+                    for bottleneck in bottlenecks['bottlenecks']:
+                        content += f"• {bottleneck['type']}: {bottleneck['count']} instances\n"
+
+                if 'optimization_recommendations' in bottlenecks:
+                    content += f"\nOptimizations:\n"
+                    for rec in bottlenecks['optimization_recommendations']:
+                        content += f"• {rec}\n"
+
+                self._show_card('bottleneck', content)
+
+            # Satisfaction patterns
+            if 'satisfaction_patterns' in insights:
+                satisfaction = insights['satisfaction_patterns']
+                content = f"User Satisfaction Analysis:\n"
+                content += f"• Overall satisfaction: {satisfaction.get('overall_satisfaction', 0):.1f}/5\n"
+
+                if 'satisfaction_by_type' in satisfaction:
+                    content += "• By question type:\n"
+                    for qtype, rating in satisfaction['satisfaction_by_type'].items():
+                        content += f"  - {qtype}: {rating:.1f}/5\n"
+
+                self._show_card('satisfaction', content)
+        finally:
+            insights_widget.setUpdatesEnabled(True)
+
         # Update recommendations
         self.update_recommendations(insights)
         
-        # Update charts
-        self.chart_widget.plot_performance_trends(insights)
+        # Update charts (kept pending until the Charts tab is first opened)
+        if self.chart_widget is not None:
+            self.chart_widget.plot_performance_trends(insights, perf_data)
+        else:
+            self._pending_chart_data = (insights, perf_data)
     
+    RECOMMENDATION_KEYS = ('recommendations', 'improvement_suggestions',
+                           'optimization_recommendations')
+
     def update_recommendations(self, insights):
         """Update recommendations text"""
-        recommendations = []
-        
-        # Collect all recommendations
-        for category, data in insights.items():
-            if isinstance(data, dict):
-                if 'recommendations' in data:
-                    recommendations.extend(data['recommendations'])
-                if 'improvement_suggestions' in data:
-                    recommendations.extend(data['improvement_suggestions'])
-                if 'optimization_recommendations' in data:
-                    recommendations.extend(data['optimization_recommendations'])
-        
+        # Collect all recommendations in one flat pass
+        recommendations = list(itertools.chain.from_iterable(
+            data.get(key, ())
+            for data in insights.values() if isinstance(data, dict)
+            for key in self.RECOMMENDATION_KEYS
+        ))
+
         if recommendations:
             rec_text = "🤖 ML-Powered Recommendations:\n\n"
             for i, rec in enumerate(recommendations, 1):
                 rec_text += f"{i}. {rec}\n\n"
         else:
             rec_text = "No specific recommendations at this time. System is performing well!"
-        
-        self.recommendations_text.setPlainText(rec_text)
+
+        self.recommendations_text.setUpdatesEnabled(False)
+        try:
+            self.recommendations_text.setPlainText(rec_text)
+        finally:
+            self.recommendations_text.setUpdatesEnabled(True)
     
+    def closeEvent(self, event):
+        """Shut the persistent worker down cleanly"""
+        self.worker.stop()
+        self.worker.wait()
+        super().closeEvent(event)
+
     def export_report(self):
         """Export analytics report"""
         if not self.insights_data:
@@ -506,9 +702,20 @@ Document Usage:"""
         
         try:
             # Export to JSON
-            filename = f"rag_analytics_report_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, 'w') as f:
-                json.dump(self.insights_data, f, indent=2, default=str)
+            filename = f"rag_analytics_report_{datetime.now():%Y%m%d_%H%M%S}.json"
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(
+                        self.insights_data,
+                        # NON_STR_KEYS: the insights carry int dict keys
+                        # (satisfaction_distribution, cluster maps)
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                        | orjson.OPT_NON_STR_KEYS,
+                        default=str
+                    ))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(self.insights_data, f, indent=2, default=str)
             
             QMessageBox.information(self, "Export Complete", f"Report exported to {filename}")
         except Exception as e:
@@ -5,83 +5,191 @@ Automatically improves system performance based on usage patterns
 
 import numpy as np
 from typing import Dict, List, Tuple
-from .analytics import analytics_engine
+from .analytics import analytics_engine, to_epoch_us
 from .logger import rag_logger
 import json
 import sqlite3
 from datetime import datetime, timedelta
 
+try:
+    from numba import njit  # Optional JIT for the fused binning kernel
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _binned_rating_stats(values, edges, ratings):
+        """Fused digitize + per-bin sum/count in one compiled pass"""
+        n_edges = edges.size
+        sums = np.zeros(n_edges)
+        counts = np.zeros(n_edges, dtype=np.int64)
+        for i in range(values.size):
+            idx = np.searchsorted(edges, values[i], side='right')
+            if idx < 1:
+                idx = 1
+            elif idx > n_edges - 1:
+                idx = n_edges - 1
+            sums[idx] += ratings[i]
+            counts[idx] += 1
+        return sums, counts
+
 class AIOptimizer:
+    # One row of the pattern-analysis query; filled by np.fromiter so the
+    # cursor feeds a single structured array with no Python-list round-trip
+    _ROW_DTYPE = np.dtype([
+        ('search_time', 'f8'), ('generation_time', 'f8'),
+        ('context_length', 'f8'), ('chunk_count', 'f8'), ('user_rating', 'f8')
+    ])
+
     def __init__(self):
         self.optimization_history = []
-        
+        self._patterns_cache = None
+        self._patterns_cache_key = None
+
     def analyze_performance_patterns(self) -> Dict:
         """Analyze system performance patterns using AI techniques"""
-        insights = analytics_engine.get_performance_insights(days=30)
-        
-        # Get detailed query data for analysis
-        conn = sqlite3.connect(analytics_engine.db_path)
-        cursor = conn.cursor()
-        
-        # Analyze response time patterns
-        cursor.execute('''
-            SELECT search_time, generation_time, context_length, chunk_count, user_rating
-            FROM query_metrics 
-            WHERE timestamp > datetime('now', '-30 days')
-            AND user_rating IS NOT NULL
-        ''')
-        
-        data = cursor.fetchall()
-        conn.close()
-        
-        if not data:
-            return {"status": "insufficient_data"}
-        
-        # Convert to numpy arrays for analysis
-        search_times = np.array([row[0] for row in data])
-        gen_times = np.array([row[1] for row in data])
-        context_lengths = np.array([row[2] for row in data])
-        chunk_counts = np.array([row[3] for row in data])
-        ratings = np.array([row[4] for row in data])
+        # Get detailed query data for analysis over the shared connection
+        with analytics_engine.cursor() as cursor:
+            # Plain tuples here: the rows feed numpy, not named access
+            cursor.row_factory = None
+            # Reuse the previous result unless rows or ratings changed -
+            # MAX(rowid)/COUNT are O(1) so repeated calls skip the full
+            # scan and the whole NumPy pipeline
+            cursor.execute('SELECT MAX(rowid), COUNT(user_rating) FROM query_metrics')
+            cache_key = cursor.fetchone()
+            if self._patterns_cache is not None and cache_key == self._patterns_cache_key:
+                return self._patterns_cache
+
+            # Fewer than 10 rated queries in the whole table means the
+            # 30-day window cannot have enough either - skip all the
+            # aggregate SQL and array work on cold databases
+            if (cache_key[1] or 0) < 10:
+                self._patterns_cache = {"status": "insufficient_data"}
+                self._patterns_cache_key = cache_key
+                return self._patterns_cache
+
+            since_us = to_epoch_us(datetime.now() - timedelta(days=30))
+
+            # Raw rows are needed for the binning and percentile work
+            cursor.execute('''
+                SELECT search_time, generation_time, context_length, chunk_count, user_rating
+                FROM query_metrics
+                WHERE timestamp > ?
+                AND user_rating IS NOT NULL
+            ''', (since_us,))
+
+            data = np.fromiter(cursor, dtype=self._ROW_DTYPE)
+
+            # The rolling_stats table carries per-day moment sums maintained
+            # at feedback time, so the bottleneck statistics are an O(days)
+            # lookup instead of a rescan of every rated query
+            cursor.execute('''
+                SELECT SUM(n), SUM(sum_s), SUM(sum_s2), SUM(sum_g), SUM(sum_g2),
+                       SUM(sum_r), SUM(sum_r2), SUM(sum_sr), SUM(sum_gr)
+                FROM rolling_stats
+                WHERE date > date('now', '-30 days')
+            ''')
+            rolling = cursor.fetchone()
+            n = rolling[0] or 0
+            if 0 < data.size <= n:
+                time_stats = self._moment_stats(
+                    (n,) + tuple((total or 0) / n for total in rolling[1:]))
+            else:
+                # rolling_stats only covers ratings recorded through
+                # update_user_feedback since the table shipped, so on a
+                # migrated DB it undercounts the window's rated rows.
+                # Trust it only when it accounts for every rated row the
+                # raw fetch saw; otherwise rescan the raw moments so the
+                # stats describe the same rows as the percentiles
+                cursor.execute('''
+                    SELECT COUNT(*),
+                           AVG(search_time), AVG(search_time*search_time),
+                           AVG(generation_time), AVG(generation_time*generation_time),
+                           AVG(user_rating), AVG(user_rating*user_rating),
+                           AVG(search_time*user_rating), AVG(generation_time*user_rating)
+                    FROM query_metrics
+                    WHERE timestamp > ?
+                    AND user_rating IS NOT NULL
+                ''', (since_us,))
+                time_stats = self._moment_stats(cursor.fetchone())
+
+        # The per-subroutine minimums stay as defensive checks; this is the
+        # common exit for a sparse 30-day window
+        if data.size < 10:
+            self._patterns_cache = {"status": "insufficient_data"}
+            self._patterns_cache_key = cache_key
+            return self._patterns_cache
+
+        # Column views into the structured array (no copies)
+        search_times = data['search_time']
+        gen_times = data['generation_time']
+        context_lengths = data['context_length']
+        chunk_counts = data['chunk_count']
+        ratings = data['user_rating']
         
         # AI-powered pattern analysis
         patterns = {
             'optimal_context_length': self._find_optimal_context_length(context_lengths, ratings),
             'optimal_chunk_count': self._find_optimal_chunk_count(chunk_counts, ratings),
-            'performance_bottlenecks': self._identify_bottlenecks(search_times, gen_times, ratings),
+            'performance_bottlenecks': self._identify_bottlenecks(search_times, gen_times, time_stats),
             'quality_factors': self._analyze_quality_factors(context_lengths, chunk_counts, ratings)
         }
-        
+
+        self._patterns_cache = patterns
+        self._patterns_cache_key = cache_key
         return patterns
-    
+
+    @staticmethod
+    def _moment_stats(agg) -> Dict:
+        """Derive time means/stds and rating correlations from SQL moments"""
+        n, e_s, e_s2, e_g, e_g2, e_r, e_r2, e_sr, e_gr = (v or 0 for v in agg)
+
+        var_s = max(e_s2 - e_s * e_s, 0.0)
+        var_g = max(e_g2 - e_g * e_g, 0.0)
+        var_r = max(e_r2 - e_r * e_r, 0.0)
+
+        def corr(e_xy, e_x, var_x):
+            denom = (var_x * var_r) ** 0.5
+            return (e_xy - e_x * e_r) / denom if denom > 0 else 0.0
+
+        return {
+            'search_mean': e_s,
+            'search_std': var_s ** 0.5,
+            'search_rating_corr': corr(e_sr, e_s, var_s),
+            'gen_mean': e_g,
+            'gen_std': var_g ** 0.5,
+            'gen_rating_corr': corr(e_gr, e_g, var_g)
+        }
+
     def _find_optimal_context_length(self, context_lengths: np.ndarray, ratings: np.ndarray) -> Dict:
         """Find optimal context length using correlation analysis"""
         if len(context_lengths) < 10:
             return {"status": "insufficient_data"}
         
-        # Bin context lengths and calculate average ratings
+        # Bin context lengths and compute every per-bin rating mean in one
+        # bincount pass instead of masking per bin
         bins = np.linspace(context_lengths.min(), context_lengths.max(), 10)
-        bin_indices = np.digitize(context_lengths, bins)
-        
-        bin_ratings = []
-        bin_centers = []
-        
-        for i in range(1, len(bins)):
-            mask = bin_indices == i
-            if np.sum(mask) > 0:
-                bin_ratings.append(np.mean(ratings[mask]))
-                bin_centers.append((bins[i-1] + bins[i]) / 2)
-        
-        if not bin_ratings:
+        if njit is not None:
+            sums, counts = _binned_rating_stats(context_lengths, bins, ratings)
+        else:
+            # searchsorted on the sorted edges matches digitize's convention
+            # (bins[i-1] <= x < bins[i]) via a plain binary search
+            bin_indices = np.clip(np.searchsorted(bins, context_lengths, side='right'), 1, len(bins) - 1)
+            counts = np.bincount(bin_indices, minlength=len(bins))
+            sums = np.bincount(bin_indices, weights=ratings, minlength=len(bins))
+        bin_means = np.where(counts > 0, sums / np.maximum(counts, 1), -np.inf)
+
+        if not counts[1:].any():
             return {"status": "no_data"}
-        
+
         # Find optimal range
-        best_idx = np.argmax(bin_ratings)
-        optimal_length = bin_centers[best_idx]
-        
+        bin_centers = (bins[:-1] + bins[1:]) / 2
+        best_idx = int(bin_means[1:].argmax()) + 1
+        optimal_length = bin_centers[best_idx - 1]
+
         return {
             "optimal_length": int(optimal_length),
-            "confidence": bin_ratings[best_idx],
+            "confidence": float(bin_means[best_idx]),
             "current_avg": int(np.mean(context_lengths)),
             "recommendation": "increase" if optimal_length > np.mean(context_lengths) else "decrease"
         }
@@ -91,98 +199,107 @@ class AIOptimizer:
         if len(chunk_counts) < 10:
             return {"status": "insufficient_data"}
         
-        # Group by chunk count and analyze ratings
-        unique_counts = np.unique(chunk_counts)
-        count_ratings = []
-        
-        for count in unique_counts:
-            mask = chunk_counts == count
-            if np.sum(mask) >= 3:  # Need at least 3 samples
-                avg_rating = np.mean(ratings[mask])
-                count_ratings.append((count, avg_rating, np.sum(mask)))
-        
-        if not count_ratings:
+        # Group by chunk count via the inverse index - all group sums and
+        # sizes come from two bincount calls, no per-value masking
+        unique_counts, inverse = np.unique(chunk_counts, return_inverse=True)
+        group_sizes = np.bincount(inverse)
+        group_sums = np.bincount(inverse, weights=ratings)
+
+        valid = group_sizes >= 3  # Need at least 3 samples
+        if not valid.any():
             return {"status": "no_data"}
-        
+
         # Find best performing chunk count
-        best_count, best_rating, sample_size = max(count_ratings, key=lambda x: x[1])
-        
+        group_means = group_sums[valid] / group_sizes[valid]
+        best = int(group_means.argmax())
+
         return {
-            "optimal_count": int(best_count),
-            "confidence": best_rating,
-            "sample_size": sample_size,
+            "optimal_count": int(unique_counts[valid][best]),
+            "confidence": float(group_means[best]),
+            "sample_size": int(group_sizes[valid][best]),
             "current_avg": int(np.mean(chunk_counts))
         }
     
-    def _identify_bottlenecks(self, search_times: np.ndarray, gen_times: np.ndarray, ratings: np.ndarray) -> Dict:
-        """Identify performance bottlenecks using correlation analysis"""
-        total_times = search_times + gen_times
-        
-        # Calculate correlations with ratings
-        search_corr = np.corrcoef(search_times, ratings)[0, 1] if len(search_times) > 1 else 0
-        gen_corr = np.corrcoef(gen_times, ratings)[0, 1] if len(gen_times) > 1 else 0
-        
+    @staticmethod
+    def _p95(values: np.ndarray) -> float:
+        """95th percentile as an O(N) partition instead of a full sort"""
+        k = int(0.95 * (values.size - 1))
+        return float(np.partition(values, k)[k])
+
+    def _identify_bottlenecks(self, search_times: np.ndarray, gen_times: np.ndarray, time_stats: Dict) -> Dict:
+        """Identify performance bottlenecks from the SQL moment statistics"""
+        search_mean = time_stats['search_mean']
+        gen_mean = time_stats['gen_mean']
+
         bottlenecks = []
-        
+
         # Identify bottlenecks
-        if np.mean(search_times) > 2.0:
+        if search_mean > 2.0:
             bottlenecks.append({
                 "type": "search",
-                "severity": "high" if np.mean(search_times) > 5.0 else "medium",
-                "avg_time": float(np.mean(search_times)),
-                "correlation_with_rating": float(search_corr)
+                "severity": "high" if search_mean > 5.0 else "medium",
+                "avg_time": float(search_mean),
+                "correlation_with_rating": float(time_stats['search_rating_corr'])
             })
-        
-        if np.mean(gen_times) > 3.0:
+
+        if gen_mean > 3.0:
             bottlenecks.append({
                 "type": "generation",
-                "severity": "high" if np.mean(gen_times) > 8.0 else "medium",
-                "avg_time": float(np.mean(gen_times)),
-                "correlation_with_rating": float(gen_corr)
+                "severity": "high" if gen_mean > 8.0 else "medium",
+                "avg_time": float(gen_mean),
+                "correlation_with_rating": float(time_stats['gen_rating_corr'])
             })
-        
+
         return {
             "bottlenecks": bottlenecks,
             "search_time_stats": {
-                "mean": float(np.mean(search_times)),
-                "std": float(np.std(search_times)),
-                "p95": float(np.percentile(search_times, 95))
+                "mean": float(search_mean),
+                "std": float(time_stats['search_std']),
+                "p95": self._p95(search_times)
             },
             "generation_time_stats": {
-                "mean": float(np.mean(gen_times)),
-                "std": float(np.std(gen_times)),
-                "p95": float(np.percentile(gen_times, 95))
+                "mean": float(gen_mean),
+                "std": float(time_stats['gen_std']),
+                "p95": self._p95(gen_times)
             }
         }
     
     def _analyze_quality_factors(self, context_lengths: np.ndarray, chunk_counts: np.ndarray, ratings: np.ndarray) -> Dict:
         """Analyze factors affecting response quality"""
         
-        # Calculate correlations
-        context_quality_corr = np.corrcoef(context_lengths, ratings)[0, 1] if len(context_lengths) > 1 else 0
-        chunk_quality_corr = np.corrcoef(chunk_counts, ratings)[0, 1] if len(chunk_counts) > 1 else 0
-        
-        # Identify high and low quality patterns
-        high_quality_mask = ratings >= 4.0
-        low_quality_mask = ratings <= 2.0
-        
+        # One stacked corrcoef call yields both correlations from a single
+        # pass (the search/generation correlations already come from SQL)
+        if len(context_lengths) > 1:
+            corr = np.corrcoef(np.stack([context_lengths, chunk_counts, ratings]))
+            context_quality_corr = corr[0, 2]
+            chunk_quality_corr = corr[1, 2]
+        else:
+            context_quality_corr = chunk_quality_corr = 0
+        
+        # Identify high and low quality patterns via dot products with the
+        # masks - no boolean fancy-indexed copies of the data arrays
+        high_quality_mask = (ratings >= 4.0).astype(np.float64)
+        low_quality_mask = (ratings <= 2.0).astype(np.float64)
+        high_n = high_quality_mask.sum()
+        low_n = low_quality_mask.sum()
+
         quality_analysis = {
             "context_length_correlation": float(context_quality_corr),
             "chunk_count_correlation": float(chunk_quality_corr),
         }
-        
-        if np.sum(high_quality_mask) > 0:
+
+        if high_n > 0:
             quality_analysis["high_quality_patterns"] = {
-                "avg_context_length": float(np.mean(context_lengths[high_quality_mask])),
-                "avg_chunk_count": float(np.mean(chunk_counts[high_quality_mask]))
+                "avg_context_length": float(context_lengths @ high_quality_mask / high_n),
+                "avg_chunk_count": float(chunk_counts @ high_quality_mask / high_n)
             }
-        
-        if np.sum(low_quality_mask) > 0:
+
+        if low_n > 0:
             quality_analysis["low_quality_patterns"] = {
-                "avg_context_length": float(np.mean(context_lengths[low_quality_mask])),
-                "avg_chunk_count": float(np.mean(chunk_counts[low_quality_mask]))
+                "avg_context_length": float(context_lengths @ low_quality_mask / low_n),
+                "avg_chunk_count": float(chunk_counts @ low_quality_mask / low_n)
             }
-        
+
         return quality_analysis
     
     def generate_optimization_plan(self) -> List[Dict]:
@@ -1,12 +1,48 @@
 import sqlite3
 import json
 import time
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 from dataclasses import dataclass
 import numpy as np
 
+# sources/search_distances encoding: sources are stored as a
+# "\x1f"-joined string and distances as a float32 BLOB. Rows written by
+# older versions hold JSON and are detected by their leading "[".
+_SOURCE_SEP = "\x1f"
+
+def to_epoch_us(dt: datetime) -> int:
+    """Convert a datetime to the epoch-microsecond integers stored in the DB"""
+    return int(dt.timestamp() * 1_000_000)
+
+def decode_sources(value) -> List[str]:
+    """Decode a stored sources column (separator-joined or legacy JSON)"""
+    if not value:
+        return []
+    if value.startswith("["):
+        return json.loads(value)
+    return value.split(_SOURCE_SEP)
+
+def decode_distances(value) -> List[float]:
+    """Decode a stored search_distances column (float32 BLOB or legacy JSON)"""
+    if not value:
+        return []
+    if isinstance(value, bytes):
+        # A leading "[" alone is not conclusive: roughly 1 in 256 float32
+        # blobs happens to start with byte 0x5b. Legacy JSON never has a
+        # length divisible by 4 guarantee, so try the parse and fall back
+        # to the binary decode when it is not actually JSON.
+        if value[:1] == b"[":
+            try:
+                return json.loads(value)
+            except (ValueError, UnicodeDecodeError):
+                pass
+        return np.frombuffer(value, dtype=np.float32).tolist()
+    return json.loads(value)
+
 @dataclass
 class QueryMetrics:
     query_id: str
@@ -22,39 +58,132 @@ class QueryMetrics:
     search_distances: List[float]
     user_rating: Optional[int] = None
     feedback: Optional[str] = None
+    # Numeric features computed once at log time so analytics can
+    # reduce over columns instead of re-processing raw text per refresh
+    q_word_count: Optional[int] = None
+    r_length: Optional[int] = None
+    r_sentiment: Optional[float] = None
+    r_coherence: Optional[float] = None
 
 class AnalyticsEngine:
     def __init__(self, db_path: str = "data/analytics.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # One long-lived connection shared across threads behind a lock -
+        # avoids per-call connect/close and keeps the page cache warm
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Named-column rows for readability; hot numeric readers opt out
+        # per-cursor where plain tuples are faster
+        self._conn.row_factory = sqlite3.Row
+        # Set by RAGLogger so feedback writes can force its buffered
+        # metrics to disk first (the logger imports this module, so the
+        # dependency cannot point the other way)
+        self._metrics_flush_hook = None
+        self._apply_pragmas()
         self.init_database()
-    
+
+    def _apply_pragmas(self):
+        """Tune the shared connection for concurrent UI reads and fast writes"""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-64000")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+
+    @contextmanager
+    def cursor(self):
+        """Serialized cursor on the shared connection"""
+        with self._lock:
+            yield self._conn.cursor()
+
     def init_database(self):
         """Initialize analytics database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Query metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS query_metrics (
-                query_id TEXT PRIMARY KEY,
-                timestamp DATETIME,
-                question TEXT,
-                response TEXT,
-                context_length INTEGER,
-                chunk_count INTEGER,
-                search_time REAL,
-                generation_time REAL,
-                total_time REAL,
-                sources TEXT,
-                search_distances TEXT,
-                user_rating INTEGER,
-                feedback TEXT
-            )
+        with self._lock:
+            self._migrate_query_metrics(self._conn)
+            self._create_tables(self._conn)
+            self._add_feature_columns(self._conn)
+            self._conn.commit()
+
+    def _migrate_query_metrics(self, conn):
+        """One-time rebuild of query_metrics with the STRICT/epoch schema
+
+        Databases written before the schema change hold ISO text
+        timestamps; rows are copied across with the timestamps converted
+        to epoch microseconds. Runs before index creation so the indexes
+        are built once against the new table.
+        """
+        row = conn.execute(
+            "SELECT type FROM pragma_table_info('query_metrics') WHERE name = 'timestamp'"
+        ).fetchone()
+        if row is None or row[0] == 'INTEGER':
+            return
+
+        conn.execute('ALTER TABLE query_metrics RENAME TO query_metrics_old')
+        conn.execute(self._QUERY_METRICS_DDL)
+        conn.execute('''
+            INSERT INTO query_metrics (query_id, timestamp, question, response,
+                                       context_length, chunk_count, search_time,
+                                       generation_time, total_time, sources,
+                                       search_distances, user_rating, feedback)
+            SELECT query_id,
+                   CAST((julianday(timestamp, 'utc') - 2440587.5) * 86400000000 AS INTEGER),
+                   question, response, context_length, chunk_count,
+                   search_time, generation_time, total_time,
+                   sources, CAST(search_distances AS BLOB), user_rating, feedback
+            FROM query_metrics_old
         ''')
+        conn.execute('DROP TABLE query_metrics_old')
+
+    # Timestamps are integer epoch microseconds and the table is STRICT:
+    # integer B-tree compares beat string compares and the smaller rows
+    # keep more of the timestamp index in cache
+    _QUERY_METRICS_DDL = '''
+        CREATE TABLE IF NOT EXISTS query_metrics (
+            query_id TEXT PRIMARY KEY,
+            timestamp INTEGER NOT NULL,
+            question TEXT,
+            response TEXT,
+            context_length INTEGER,
+            chunk_count INTEGER,
+            search_time REAL,
+            generation_time REAL,
+            total_time REAL,
+            sources TEXT,
+            search_distances BLOB,
+            user_rating INTEGER,
+            feedback TEXT,
+            q_word_count INTEGER,
+            r_length INTEGER,
+            r_sentiment REAL,
+            r_coherence REAL
+        ) STRICT
+    '''
+
+    # Feature columns added after the STRICT rebuild shipped; existing
+    # databases pick them up via ALTER TABLE (legacy rows stay NULL and
+    # analytics computes their features on the fly)
+    _FEATURE_COLUMNS = (
+        ('q_word_count', 'INTEGER'),
+        ('r_length', 'INTEGER'),
+        ('r_sentiment', 'REAL'),
+        ('r_coherence', 'REAL'),
+    )
+
+    def _add_feature_columns(self, conn):
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(query_metrics)")}
+        for name, decl in self._FEATURE_COLUMNS:
+            if name not in existing:
+                conn.execute(f'ALTER TABLE query_metrics ADD COLUMN {name} {decl}')
+
+    def _create_tables(self, conn):
+
+        # Query metrics table
+        conn.execute(self._QUERY_METRICS_DDL)
         
         # Document metrics table
-        cursor.execute('''
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS document_metrics (
                 doc_id TEXT PRIMARY KEY,
                 filename TEXT,
@@ -67,7 +196,7 @@ class AnalyticsEngine:
         ''')
         
         # Performance trends table
-        cursor.execute('''
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS performance_trends (
                 date DATE PRIMARY KEY,
                 avg_response_time REAL,
@@ -77,20 +206,31 @@ class AnalyticsEngine:
                 success_rate REAL
             )
         ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def log_query(self, metrics: QueryMetrics):
-        """Log query metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO query_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+
+        # Rolling per-day moment sums for rated queries, folded in as
+        # feedback arrives so pattern analysis never rescans query_metrics
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rolling_stats (
+                date DATE PRIMARY KEY,
+                n INTEGER DEFAULT 0,
+                sum_s REAL DEFAULT 0, sum_s2 REAL DEFAULT 0,
+                sum_g REAL DEFAULT 0, sum_g2 REAL DEFAULT 0,
+                sum_r REAL DEFAULT 0, sum_r2 REAL DEFAULT 0,
+                sum_sr REAL DEFAULT 0, sum_gr REAL DEFAULT 0
+            )
+        ''')
+
+        # Indexes so the dashboard date-range filters and usage updates
+        # run as index scans instead of full table scans
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_qm_ts ON query_metrics(timestamp)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_qm_ts_rating ON query_metrics(timestamp, user_rating)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_dm_filename ON document_metrics(filename)')
+
+    @staticmethod
+    def _metrics_row(metrics: QueryMetrics) -> tuple:
+        return (
             metrics.query_id,
-            metrics.timestamp,
+            to_epoch_us(metrics.timestamp),
             metrics.question,
             metrics.response,
             metrics.context_length,
@@ -98,119 +238,190 @@ class AnalyticsEngine:
             metrics.search_time,
             metrics.generation_time,
             metrics.total_time,
-            json.dumps(metrics.sources),
-            json.dumps(metrics.search_distances),
+            _SOURCE_SEP.join(metrics.sources),
+            np.asarray(metrics.search_distances, dtype=np.float32).tobytes(),
             metrics.user_rating,
-            metrics.feedback
-        ))
-        
-        conn.commit()
-        conn.close()
-    
-    def log_document(self, doc_id: str, filename: str, file_size: int, 
+            metrics.feedback,
+            metrics.q_word_count,
+            metrics.r_length,
+            metrics.r_sentiment,
+            metrics.r_coherence
+        )
+
+    def log_query(self, metrics: QueryMetrics):
+        """Log query metrics"""
+        self.log_queries([metrics])
+
+    def log_queries(self, metrics_list: List[QueryMetrics]):
+        """Log a batch of query metrics in one transaction
+
+        One commit - and therefore one fsync - covers the whole batch.
+        Plain INSERT: query_ids are UUIDs, so conflicts cannot happen
+        and the REPLACE machinery would be pure overhead.
+        """
+        if not metrics_list:
+            return
+        rows = [self._metrics_row(m) for m in metrics_list]
+        with self._lock:
+            self._conn.executemany('''
+                INSERT INTO query_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._conn.commit()
+
+    def log_document(self, doc_id: str, filename: str, file_size: int,
                     chunk_count: int, avg_chunk_size: float):
         """Log document metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO document_metrics 
-            (doc_id, filename, file_size, chunk_count, avg_chunk_size, upload_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (doc_id, filename, file_size, chunk_count, avg_chunk_size, datetime.now()))
-        
-        conn.commit()
-        conn.close()
-    
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO document_metrics
+                (doc_id, filename, file_size, chunk_count, avg_chunk_size, upload_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (doc_id, filename, file_size, chunk_count, avg_chunk_size, datetime.now()))
+            self._conn.commit()
+
+    _ROLLING_UPSERT_SQL = '''
+        INSERT INTO rolling_stats (date, n, sum_s, sum_s2, sum_g, sum_g2,
+                                   sum_r, sum_r2, sum_sr, sum_gr)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            n = n + excluded.n,
+            sum_s = sum_s + excluded.sum_s, sum_s2 = sum_s2 + excluded.sum_s2,
+            sum_g = sum_g + excluded.sum_g, sum_g2 = sum_g2 + excluded.sum_g2,
+            sum_r = sum_r + excluded.sum_r, sum_r2 = sum_r2 + excluded.sum_r2,
+            sum_sr = sum_sr + excluded.sum_sr, sum_gr = sum_gr + excluded.sum_gr
+    '''
+
+    def register_metrics_flush(self, hook):
+        """Register a callable that flushes buffered query metrics"""
+        self._metrics_flush_hook = hook
+
     def update_user_feedback(self, query_id: str, rating: int, feedback: str = None):
         """Update user feedback for a query"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE query_metrics SET user_rating = ?, feedback = ? WHERE query_id = ?
-        ''', (rating, feedback, query_id))
-        
-        conn.commit()
-        conn.close()
-    
+        # A rating can arrive before the logger's 250 ms flush has written
+        # the query row, in which case the UPDATE below matches nothing
+        # and the rating is silently lost. Drain the buffer first - and
+        # before taking the lock, since the flush acquires it too.
+        if self._metrics_flush_hook is not None:
+            self._metrics_flush_hook()
+
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT timestamp, search_time, generation_time, user_rating
+                FROM query_metrics WHERE query_id = ?
+            ''', (query_id,)).fetchone()
+
+            self._conn.execute('''
+                UPDATE query_metrics SET user_rating = ?, feedback = ? WHERE query_id = ?
+            ''', (rating, feedback, query_id))
+
+            if row is not None:
+                self._fold_rating_into_rolling(self._conn, row, rating)
+            self._conn.commit()
+
+    def _fold_rating_into_rolling(self, conn, row, rating: int):
+        """Add a newly rated query's moments to its day's rolling sums
+
+        A re-rated query only adjusts the rating terms by the delta so the
+        day's counts and time sums are never double-counted.
+        """
+        timestamp, search_time, generation_time, old_rating = row
+        day = datetime.fromtimestamp(timestamp / 1e6).strftime('%Y-%m-%d')
+        s = search_time or 0.0
+        g = generation_time or 0.0
+
+        if old_rating is None:
+            values = (day, 1, s, s * s, g, g * g,
+                      rating, rating * rating, s * rating, g * rating)
+        else:
+            dr = rating - old_rating
+            dr2 = rating * rating - old_rating * old_rating
+            values = (day, 0, 0.0, 0.0, 0.0, 0.0, dr, dr2, s * dr, g * dr)
+
+        conn.execute(self._ROLLING_UPSERT_SQL, values)
+
     def increment_document_usage(self, filenames: List[str]):
         """Increment usage count for documents used in queries"""
         if not filenames:
             return
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for filename in filenames:
-            cursor.execute('''
+
+        with self._lock:
+            self._conn.executemany('''
                 UPDATE document_metrics SET usage_count = usage_count + 1 WHERE filename = ?
-            ''', (filename,))
-        
-        conn.commit()
-        conn.close()
-    
-    def get_performance_insights(self, days: int = 7) -> Dict:
-        """Get performance insights for last N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        since_date = datetime.now() - timedelta(days=days)
-        
+            ''', [(filename,) for filename in filenames])
+            self._conn.commit()
+
+    def get_dashboard_bundle(self, days: int = 7) -> Dict:
+        """Fetch performance, document, and failing-query stats in one round-trip
+
+        All three dashboard queries run under one lock acquisition on the
+        shared connection, not three connections.
+        """
+        with self._lock:
+            return self._fetch_dashboard_bundle(self._conn, days)
+
+    # Dashboard SQL kept as constants so sqlite3's statement cache can
+    # reuse the prepared statements across refreshes
+    _PERFORMANCE_SQL = '''
+        SELECT
+            AVG(total_time) as avg_response_time,
+            AVG(context_length) as avg_context_length,
+            COUNT(*) as total_queries,
+            AVG(user_rating) as avg_rating,
+            AVG(CASE WHEN LENGTH(response) > 50 THEN 1.0 ELSE 0.0 END) as success_rate,
+            AVG(search_time) as avg_search_time,
+            AVG(generation_time) as avg_generation_time
+        FROM query_metrics
+        WHERE timestamp > ?
+    '''
+
+    _FAILING_QUERIES_SQL = '''
+        SELECT question, AVG(user_rating) as avg_rating, COUNT(*) as count
+        FROM query_metrics
+        WHERE timestamp > ? AND user_rating IS NOT NULL
+        GROUP BY question
+        ORDER BY avg_rating ASC
+        LIMIT 5
+    '''
+
+    _DOC_STATS_SQL = '''
+        SELECT filename, usage_count, chunk_count, avg_chunk_size
+        FROM document_metrics
+        ORDER BY usage_count DESC
+        LIMIT 10
+    '''
+
+    def _fetch_dashboard_bundle(self, conn, days: int) -> Dict:
+        # The cutoff is an integer epoch value so SQLite runs pure integer
+        # compares on the timestamp index, no adaptor or string parsing
+        since_us = to_epoch_us(datetime.now() - timedelta(days=days))
+
         # Query performance metrics
-        cursor.execute('''
-            SELECT 
-                AVG(total_time) as avg_response_time,
-                AVG(context_length) as avg_context_length,
-                COUNT(*) as total_queries,
-                AVG(user_rating) as avg_rating,
-                AVG(CASE WHEN LENGTH(response) > 50 THEN 1.0 ELSE 0.0 END) as success_rate,
-                AVG(search_time) as avg_search_time,
-                AVG(generation_time) as avg_generation_time
-            FROM query_metrics 
-            WHERE timestamp > ?
-        ''', (since_date,))
-        
-        result = cursor.fetchone()
-        
+        result = conn.execute(self._PERFORMANCE_SQL, (since_us,)).fetchone()
+
         # Get top failing queries
-        cursor.execute('''
-            SELECT question, AVG(user_rating) as avg_rating, COUNT(*) as count
-            FROM query_metrics 
-            WHERE timestamp > ? AND user_rating IS NOT NULL
-            GROUP BY question
-            ORDER BY avg_rating ASC
-            LIMIT 5
-        ''', (since_date,))
-        
-        failing_queries = cursor.fetchall()
-        
+        failing_queries = conn.execute(self._FAILING_QUERIES_SQL, (since_us,)).fetchall()
+
         # Get document usage stats
-        cursor.execute('''
-            SELECT filename, usage_count, chunk_count, avg_chunk_size
-            FROM document_metrics
-            ORDER BY usage_count DESC
-            LIMIT 10
-        ''')
-        
-        doc_stats = cursor.fetchall()
-        
-        conn.close()
-        
+        doc_stats = conn.execute(self._DOC_STATS_SQL).fetchall()
+
         return {
             'performance': {
-                'avg_response_time': result[0] or 0,
-                'avg_context_length': result[1] or 0,
-                'total_queries': result[2] or 0,
-                'avg_rating': result[3] or 0,
-                'success_rate': result[4] or 0,
-                'avg_search_time': result[5] or 0,
-                'avg_generation_time': result[6] or 0
+                'avg_response_time': result['avg_response_time'] or 0,
+                'avg_context_length': result['avg_context_length'] or 0,
+                'total_queries': result['total_queries'] or 0,
+                'avg_rating': result['avg_rating'] or 0,
+                'success_rate': result['success_rate'] or 0,
+                'avg_search_time': result['avg_search_time'] or 0,
+                'avg_generation_time': result['avg_generation_time'] or 0
             },
             'failing_queries': failing_queries,
             'document_stats': doc_stats
         }
-    
+
+    def get_performance_insights(self, days: int = 7) -> Dict:
+        """Get performance insights for last N days"""
+        return self.get_dashboard_bundle(days)
+
     def get_optimization_recommendations(self) -> List[str]:
         """Get AI-powered optimization recommendations"""
         insights = self.get_performance_insights()
@@ -1,6 +1,6 @@
-import os
 from datetime import datetime
 from typing import List, Dict
+from xml.sax.saxutils import escape
 from .chat_history import chat_history
 
 try:
@@ -13,10 +13,40 @@ except ImportError:
     PDF_AVAILABLE = False
 
 class ChatExporter:
+    # Paragraph markup templates shared by all messages; content is
+    # pre-escaped once so ReportLab's XML parser never chokes on it
+    _MSG_TEMPLATE = "<b>[{timestamp}] {speaker}:</b> {content}"
+    _META_TEMPLATE = "<i>{text}</i>"
+
     def __init__(self):
         self.styles = None
+        self._title_cache = {}
+        self._title_cache_key = None
         if PDF_AVAILABLE:
             self._init_pdf_styles()
+
+    @staticmethod
+    def _format_timestamp(iso_timestamp: str) -> str:
+        """Extract HH:MM:SS by slicing the ISO string; no datetime round-trip"""
+        timestamp = iso_timestamp[11:19]
+        if len(timestamp) == 8 and timestamp[2] == ':':
+            return timestamp
+        try:
+            return datetime.fromisoformat(iso_timestamp).strftime('%H:%M:%S')
+        except ValueError:
+            return iso_timestamp
+
+    def _get_session_title(self, session_id: str) -> str:
+        """O(1) title lookup via a dict cache keyed to the sessions' state"""
+        signature = chat_history.sessions_signature()
+        if signature != self._title_cache_key:
+            self._title_cache = {
+                session['session_id']: session['title']
+                for session in chat_history.get_sessions()
+            }
+            self._title_cache_key = signature
+
+        return self._title_cache.get(session_id, "Chat Session")
     
     def _init_pdf_styles(self):
         """Initialize PDF styles"""
@@ -38,36 +68,36 @@ class ChatExporter:
         """Export chat session to TXT file"""
         try:
             messages = chat_history.get_session_messages(session_id)
-            sessions = chat_history.get_sessions()
-            
-            # Find session title
-            session_title = "Chat Session"
-            for session in sessions:
-                if session['session_id'] == session_id:
-                    session_title = session['title']
-                    break
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(f"RAG Desktop Assistant - Chat Export\n")
-                f.write(f"Session: {session_title}\n")
-                f.write(f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n\n")
-                
-                for msg in messages:
-                    timestamp = datetime.fromisoformat(msg['timestamp']).strftime('%H:%M:%S')
-                    
-                    if msg['type'] == 'user':
-                        f.write(f"[{timestamp}] You: {msg['content']}\n\n")
-                    elif msg['type'] == 'assistant':
-                        f.write(f"[{timestamp}] Assistant: {msg['content']}\n")
-                        if msg['sources']:
-                            f.write(f"Sources: {', '.join(msg['sources'])}\n")
-                        if msg['rating']:
-                            f.write(f"Rating: {msg['rating']}/5\n")
-                        f.write("\n")
-                    elif msg['type'] == 'system':
-                        f.write(f"[{timestamp}] System: {msg['content']}\n\n")
-            
+            session_title = self._get_session_title(session_id)
+
+            # Accumulate the export in memory and write it in one call
+            # instead of issuing many small writes inside the loop
+            parts = [
+                "RAG Desktop Assistant - Chat Export\n",
+                f"Session: {session_title}\n",
+                f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                "=" * 60 + "\n\n",
+            ]
+            parts_append = parts.append
+
+            for msg in messages:
+                timestamp = self._format_timestamp(msg['timestamp'])
+
+                if msg['type'] == 'user':
+                    parts_append(f"[{timestamp}] You: {msg['content']}\n\n")
+                elif msg['type'] == 'assistant':
+                    parts_append(f"[{timestamp}] Assistant: {msg['content']}\n")
+                    if msg['sources']:
+                        parts_append(f"Sources: {', '.join(msg['sources'])}\n")
+                    if msg['rating']:
+                        parts_append(f"Rating: {msg['rating']}/5\n")
+                    parts_append("\n")
+                elif msg['type'] == 'system':
+                    parts_append(f"[{timestamp}] System: {msg['content']}\n\n")
+
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("".join(parts))
+
             return True
         except Exception as e:
             print(f"Error exporting to TXT: {e}")
@@ -80,15 +110,8 @@ class ChatExporter:
         
         try:
             messages = chat_history.get_session_messages(session_id)
-            sessions = chat_history.get_sessions()
-            
-            # Find session title
-            session_title = "Chat Session"
-            for session in sessions:
-                if session['session_id'] == session_id:
-                    session_title = session['title']
-                    break
-            
+            session_title = self._get_session_title(session_id)
+
             doc = SimpleDocTemplate(file_path, pagesize=letter)
             story = []
             
@@ -100,19 +123,30 @@ class ChatExporter:
             
             # Messages
             for msg in messages:
-                timestamp = datetime.fromisoformat(msg['timestamp']).strftime('%H:%M:%S')
-                
+                timestamp = self._format_timestamp(msg['timestamp'])
+                content = escape(msg['content'])
+
                 if msg['type'] == 'user':
-                    story.append(Paragraph(f"<b>[{timestamp}] You:</b> {msg['content']}", self.styles['UserMessage']))
+                    story.append(Paragraph(
+                        self._MSG_TEMPLATE.format(timestamp=timestamp, speaker="You", content=content),
+                        self.styles['UserMessage']))
                 elif msg['type'] == 'assistant':
-                    story.append(Paragraph(f"<b>[{timestamp}] Assistant:</b> {msg['content']}", self.styles['AssistantMessage']))
+                    story.append(Paragraph(
+                        self._MSG_TEMPLATE.format(timestamp=timestamp, speaker="Assistant", content=content),
+                        self.styles['AssistantMessage']))
                     if msg['sources']:
-                        story.append(Paragraph(f"<i>Sources: {', '.join(msg['sources'])}</i>", self.styles['Normal']))
+                        story.append(Paragraph(
+                            self._META_TEMPLATE.format(text=escape(f"Sources: {', '.join(msg['sources'])}")),
+                            self.styles['Normal']))
                     if msg['rating']:
-                        story.append(Paragraph(f"<i>Rating: {msg['rating']}/5</i>", self.styles['Normal']))
+                        story.append(Paragraph(
+                            self._META_TEMPLATE.format(text=f"Rating: {msg['rating']}/5"),
+                            self.styles['Normal']))
                 elif msg['type'] == 'system':
-                    story.append(Paragraph(f"<b>[{timestamp}] System:</b> {msg['content']}", self.styles['Normal']))
-                
+                    story.append(Paragraph(
+                        self._MSG_TEMPLATE.format(timestamp=timestamp, speaker="System", content=content),
+                        self.styles['Normal']))
+
                 story.append(Spacer(1, 0.1*inch))
             
             doc.build(story)
@@ -1,122 +1,207 @@
 import sqlite3
 import json
+import atexit
+
+try:
+    # C serializer; dumps returns bytes, which SQLite stores directly,
+    # and loads accepts the str rows older databases still hold
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 import os
 
+# SQL kept as module-level constants so sqlite3's internal statement
+# cache reuses the prepared statements across calls
+_INSERT_SESSION_SQL = '''
+    INSERT INTO chat_sessions (session_id, title, created_at, updated_at)
+    VALUES (?, ?, ?, ?)
+'''
+
+_INSERT_MSG_SQL = '''
+    INSERT INTO chat_messages (session_id, message_type, content, sources, rating, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_TOUCH_SESSION_SQL = '''
+    UPDATE chat_sessions SET updated_at = ? WHERE session_id = ?
+'''
+
+_UPDATE_TITLE_SQL = '''
+    UPDATE chat_sessions SET title = ?, updated_at = ? WHERE session_id = ?
+'''
+
+_SELECT_SESSIONS_SQL = '''
+    SELECT session_id, title, created_at, updated_at
+    FROM chat_sessions
+    ORDER BY updated_at DESC
+'''
+
+_SELECT_MESSAGES_SQL = '''
+    SELECT message_type, content, sources, rating, timestamp
+    FROM chat_messages
+    WHERE session_id = ?
+    ORDER BY timestamp ASC
+'''
+
 class ChatHistoryManager:
     def __init__(self, db_path: str = "data/chat_history.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # One long-lived autocommit connection shared behind a lock, the
+        # same pattern as AnalyticsEngine - no connect/parse/close per call
+        self._lock = threading.Lock()
+        # cached_statements sizes the exact-match prepared-statement cache;
+        # the module-level SQL constants guarantee identical strings per call
+        self._conn = sqlite3.connect(db_path, check_same_thread=False,
+                                     isolation_level=None, cached_statements=64)
+        self._apply_pragmas()
         self.init_database()
-    
+        atexit.register(self.close)
+
+    def _apply_pragmas(self):
+        """Tune the shared connection so UI reads never stall on writes
+
+        WAL lets readers see a snapshot while the writer appends (needs a
+        filesystem with proper mmap/locking support, which every desktop
+        target here has).
+        """
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-20000")
+        self._conn.execute("PRAGMA wal_autocheckpoint=1000")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+
+    def close(self):
+        """Close the shared connection (idempotent)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def init_database(self):
         """Initialize chat history database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS chat_sessions (
-                session_id TEXT PRIMARY KEY,
-                title TEXT,
-                created_at DATETIME,
-                updated_at DATETIME
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS chat_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                message_type TEXT,
-                content TEXT,
-                sources TEXT,
-                rating INTEGER,
-                timestamp DATETIME,
-                FOREIGN KEY (session_id) REFERENCES chat_sessions (session_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS chat_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    created_at DATETIME,
+                    updated_at DATETIME
+                )
+            ''')
+
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS chat_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    message_type TEXT,
+                    content TEXT,
+                    sources TEXT,
+                    rating INTEGER,
+                    timestamp DATETIME,
+                    FOREIGN KEY (session_id) REFERENCES chat_sessions (session_id)
+                )
+            ''')
+
+            # Message loads filter by session and sort by time, session
+            # lists sort by recency, and deletes filter by session - give
+            # each an index so none of them scan and sort the whole table
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_msg_session_ts
+                ON chat_messages(session_id, timestamp)
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sess_updated
+                ON chat_sessions(updated_at DESC)
+            ''')
+
     def create_session(self, title: str = None) -> str:
         """Create new chat session"""
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Nanosecond id: two sessions created in the same second used to
+        # collide on the second-resolution timestamp primary key
+        session_id = str(time.time_ns())
         if not title:
-            title = f"Chat {session_id}"
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO chat_sessions (session_id, title, created_at, updated_at)
-            VALUES (?, ?, ?, ?)
-        ''', (session_id, title, datetime.now(), datetime.now()))
-        
-        conn.commit()
-        conn.close()
+            title = f"Chat {datetime.now():%Y%m%d_%H%M%S}"
+
+        with self._lock:
+            self._conn.execute(_INSERT_SESSION_SQL,
+                               (session_id, title, datetime.now(), datetime.now()))
         return session_id
-    
-    def save_message(self, session_id: str, message_type: str, content: str, 
+
+    def save_message(self, session_id: str, message_type: str, content: str,
                     sources: List[str] = None, rating: int = None):
         """Save message to chat history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        sources_json = json.dumps(sources) if sources else None
-        
-        cursor.execute('''
-            INSERT INTO chat_messages (session_id, message_type, content, sources, rating, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (session_id, message_type, content, sources_json, rating, datetime.now()))
-        
-        # Update session timestamp
-        cursor.execute('''
-            UPDATE chat_sessions SET updated_at = ? WHERE session_id = ?
-        ''', (datetime.now(), session_id))
-        
-        conn.commit()
-        conn.close()
-    
+        self.save_messages(session_id, [(message_type, content, sources, rating)])
+
+    def save_messages(self, session_id: str, rows: List[tuple]):
+        """Save a batch of (message_type, content, sources, rating) rows
+
+        All inserts plus the single session touch run in one transaction,
+        so a replay or import pays one fsync for N rows.
+        """
+        if not rows:
+            return
+        now = datetime.now()
+        params = [
+            (session_id, message_type, content,
+             _json_dumps(sources) if sources else None, rating, now)
+            for message_type, content, sources, rating in rows
+        ]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_INSERT_MSG_SQL, params)
+                self._conn.execute(_TOUCH_SESSION_SQL, (now, session_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def sessions_signature(self):
+        """(MAX(updated_at), COUNT(*)) of the sessions - changes with the data
+
+        Every write path touches updated_at, so this is a reliable cache
+        key where file mtime is not: under WAL journaling commits land in
+        the -wal file and the main DB's mtime stays unchanged.
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT MAX(updated_at), COUNT(*) FROM chat_sessions').fetchone()
+
     def get_sessions(self) -> List[Dict]:
         """Get all chat sessions"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT session_id, title, created_at, updated_at
-            FROM chat_sessions
-            ORDER BY updated_at DESC
-        ''')
-        
+        with self._lock:
+            rows = self._conn.execute(_SELECT_SESSIONS_SQL).fetchall()
+
         sessions = []
-        for row in cursor.fetchall():
+        for row in rows:
             sessions.append({
                 'session_id': row[0],
                 'title': row[1],
                 'created_at': row[2],
                 'updated_at': row[3]
             })
-        
-        conn.close()
+
         return sessions
-    
+
     def get_session_messages(self, session_id: str) -> List[Dict]:
         """Get messages for a session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT message_type, content, sources, rating, timestamp
-            FROM chat_messages
-            WHERE session_id = ?
-            ORDER BY timestamp ASC
-        ''', (session_id,))
-        
+        with self._lock:
+            rows = self._conn.execute(_SELECT_MESSAGES_SQL, (session_id,)).fetchall()
+
         messages = []
-        for row in cursor.fetchall():
-            sources = json.loads(row[2]) if row[2] else []
+        for row in rows:
+            sources = _json_loads(row[2]) if row[2] else []
             messages.append({
                 'type': row[0],
                 'content': row[1],
@@ -124,32 +209,25 @@ class ChatHistoryManager:
                 'rating': row[3],
                 'timestamp': row[4]
             })
-        
-        conn.close()
+
         return messages
-    
+
     def delete_session(self, session_id: str):
         """Delete a chat session and its messages"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM chat_messages WHERE session_id = ?', (session_id,))
-        cursor.execute('DELETE FROM chat_sessions WHERE session_id = ?', (session_id,))
-        
-        conn.commit()
-        conn.close()
-    
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute('DELETE FROM chat_messages WHERE session_id = ?', (session_id,))
+                self._conn.execute('DELETE FROM chat_sessions WHERE session_id = ?', (session_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
     def update_session_title(self, session_id: str, title: str):
         """Update session title"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE chat_sessions SET title = ?, updated_at = ? WHERE session_id = ?
-        ''', (title, datetime.now(), session_id))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(_UPDATE_TITLE_SQL, (title, datetime.now(), session_id))
 
 # Global instance
-chat_history = ChatHistoryManager()
\ No newline at end of file
+chat_history = ChatHistoryManager()
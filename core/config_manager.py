@@ -29,7 +29,15 @@ class ConfigManager:
                 'lazy_loading': True
             }
         }
+        # QSettings values are pulled in lazily: each read is a platform
+        # store round-trip, and paths that never touch UI geometry
+        # (headless runs, tests) shouldn't pay for them at import
+        self._ui_loaded = False
         self.config = self.load_config()
+        # get() is on UI redraw/resize paths: split dot-keys once into
+        # path tuples and serve repeated reads from a flat cache
+        self._path_cache: Dict[str, tuple] = {}
+        self._flat_cache: Dict[str, Any] = {}
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file and QSettings"""
@@ -44,18 +52,34 @@ class ConfigManager:
             except Exception as e:
                 print(f"Error loading config file: {e}")
         
-        # Load UI settings from QSettings
-        config['window']['width'] = self.settings.value('window/width', config['window']['width'], type=int)
-        config['window']['height'] = self.settings.value('window/height', config['window']['height'], type=int)
-        config['window']['x'] = self.settings.value('window/x', config['window']['x'], type=int)
-        config['window']['y'] = self.settings.value('window/y', config['window']['y'], type=int)
-        config['splitter']['left_width'] = self.settings.value('splitter/left_width', config['splitter']['left_width'], type=int)
-        config['splitter']['right_width'] = self.settings.value('splitter/right_width', config['splitter']['right_width'], type=int)
-        
         return config
+
+    def _load_ui_settings(self):
+        """Pull window/splitter geometry from QSettings on first UI read"""
+        if self._ui_loaded:
+            return
+        self._ui_loaded = True
+
+        window = self.config['window']
+        self.settings.beginGroup('window')
+        window['width'] = self.settings.value('width', window['width'], type=int)
+        window['height'] = self.settings.value('height', window['height'], type=int)
+        window['x'] = self.settings.value('x', window['x'], type=int)
+        window['y'] = self.settings.value('y', window['y'], type=int)
+        self.settings.endGroup()
+
+        splitter = self.config['splitter']
+        self.settings.beginGroup('splitter')
+        splitter['left_width'] = self.settings.value('left_width', splitter['left_width'], type=int)
+        splitter['right_width'] = self.settings.value('right_width', splitter['right_width'], type=int)
+        self.settings.endGroup()
     
     def save_config(self):
         """Save configuration to file and QSettings"""
+        # Make sure stored geometry is in self.config before writing it
+        # back, or a headless save would reset it to defaults
+        self._load_ui_settings()
+
         # Save to JSON file
         try:
             with open(self.config_file, 'w') as f:
@@ -71,30 +95,51 @@ class ConfigManager:
         self.settings.setValue('splitter/left_width', self.config['splitter']['left_width'])
         self.settings.setValue('splitter/right_width', self.config['splitter']['right_width'])
     
+    def _path(self, key: str) -> tuple:
+        """Split a dot-key once and reuse the tuple on later calls"""
+        path = self._path_cache.get(key)
+        if path is None:
+            path = self._path_cache[key] = tuple(key.split('.'))
+        return path
+
     def get(self, key: str, default=None):
         """Get configuration value using dot notation"""
-        keys = key.split('.')
+        if key in self._flat_cache:
+            return self._flat_cache[key]
+
+        if not self._ui_loaded and key.startswith(('window.', 'splitter.')):
+            self._load_ui_settings()
+
         value = self.config
-        
-        for k in keys:
+        for k in self._path(key):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
                 return default
-        
+
+        # Only cache resolved keys; misses fall through to the caller's
+        # default, which can differ per call site
+        self._flat_cache[key] = value
         return value
-    
+
     def set(self, key: str, value: Any):
         """Set configuration value using dot notation"""
-        keys = key.split('.')
+        # Load stored geometry first so a later lazy load can't clobber
+        # the value being written
+        if not self._ui_loaded and key.startswith(('window.', 'splitter.')):
+            self._load_ui_settings()
+
+        keys = self._path(key)
         config = self.config
-        
+
         for k in keys[:-1]:
             if k not in config:
                 config[k] = {}
             config = config[k]
-        
+
         config[keys[-1]] = value
+        # A write may shadow any cached subtree read - drop the flat cache
+        self._flat_cache.clear()
     
     def _merge_config(self, base: Dict, update: Dict):
         """Recursively merge configuration dictionaries"""
@@ -7,6 +7,54 @@ from .tools import ToolRegistry
 import atexit
 import gc
 import json
+import re
+
+try:
+    # Optional DFA regex engine (no backtracking, single-pass scan) -
+    # noticeably faster on multi-KB contexts, same API as re
+    import re2 as _re_impl
+except ImportError:
+    _re_impl = re
+
+# All entity types in one alternation so extraction makes a single pass
+# over the context; the first matching alternative wins, so organization
+# names are not re-reported as plain proper nouns
+_ENTITY_RE = _re_impl.compile(
+    r'(?P<dates>\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b)'
+    r'|(?P<organizations>\b[A-Z][a-z]+ (?:Inc|Corp|LLC|Ltd|Company|Organization)\b)'
+    r'|(?P<proper_nouns>\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b)'
+    r'|(?P<numbers>\b\d+(?:\.\d+)?(?:%|\$|€|£)?\b)'
+)
+
+# Prompt template built once at import; per query only the three
+# variable slots are filled in
+_PROMPT_TMPL = """You are a helpful AI assistant that answers questions based on provided document context.
+
+Document Context (analyze ALL sections):
+{ctx}
+
+{entities}
+
+Question: {q}
+
+Instructions:
+- Carefully read ALL context sections [Context 1], [Context 2], etc.
+- Pay attention to named entities, relationships, and semantic connections
+- For questions about totals/summaries, combine information from multiple sections
+- Answer using ONLY the information provided in the context
+- Be thorough for complex questions (total experience, overall summary, etc.)
+- If asking about totals, add up all relevant information from different sections
+- Cite specific details when possible
+- If context is insufficient, clearly state what's missing
+- Understand nuances, implications, and logical inferences from the context
+- Provide abstractive summaries when requested, not just extractive quotes
+- You have access to tools for calculations, date operations, and text analysis - use them when needed
+- For mathematical calculations, use the calculator tool
+- For date-related questions (current date, current time, date differences), use the date_calculator tool
+- For text analysis tasks (word count, character count, extract data), use the text_analyzer tool
+- If the document context doesn't contain the answer and you have a relevant tool, use the tool instead
+
+Answer (use tools when appropriate):"""
 
 class GeminiProcessor:
     def __init__(self):
@@ -24,12 +72,15 @@ class GeminiProcessor:
         try:
             genai.configure(api_key=api_key)
             rag_logger.info("Gemini API configured successfully")
-            
-            # Test API connection first
-            test_model = genai.GenerativeModel('gemini-1.5-flash-latest')
-            test_response = test_model.generate_content("Hello")
-            rag_logger.info(f"Gemini API test successful: {test_response.text[:50]}...")
-            
+
+            # No live "Hello" probe at startup: it blocked launch on a
+            # network round-trip and failed offline. Only the key format
+            # is sanity-checked here; the first real query verifies the
+            # connection and surfaces auth errors
+            if not api_key.startswith('AIza'):
+                rag_logger.warning("GEMINI_API_KEY does not look like a Google API key")
+            self._tested = False
+
             # Initialize model with tools (fixed schema)
             tools = ToolRegistry.get_tool_definitions()
             self.model = genai.GenerativeModel(
@@ -50,11 +101,10 @@ class GeminiProcessor:
     def process_question(self, question: str, context: str, search_results: List[Dict], stream_callback=None) -> str:
         """Process question using Google Gemini with RAG context"""
         
-        # Get source documents for citation
-        sources = list(set([result['metadata']['filename'] for result in search_results]))
-        source_info = f"Sources: {', '.join(sources)}" if sources else ""
-        
-        rag_logger.info(f"Processing question with Gemini. Context length: {len(context)}, Sources: {sources}")
+        # Get source documents for citation - one pass, no interim list
+        sources = {result['metadata']['filename'] for result in search_results}
+
+        rag_logger.info(f"Processing question with Gemini. Context length: {len(context)}, Sources: {sorted(sources)}")
         rag_logger.debug(f"Question: {question[:100]}...")
         # Clean context for logging to avoid unicode errors
         clean_context = context[:500].encode('ascii', 'ignore').decode('ascii')
@@ -63,34 +113,8 @@ class GeminiProcessor:
         # Extract entities and context for enhanced prompting
         entities_info = self._extract_context_entities(context)
         
-        # Create enhanced prompt for Gemini
-        prompt = f"""You are a helpful AI assistant that answers questions based on provided document context.
-
-Document Context (analyze ALL sections):
-{context}
-
-{entities_info}
-
-Question: {question}
-
-Instructions:
-- Carefully read ALL context sections [Context 1], [Context 2], etc.
-- Pay attention to named entities, relationships, and semantic connections
-- For questions about totals/summaries, combine information from multiple sections
-- Answer using ONLY the information provided in the context
-- Be thorough for complex questions (total experience, overall summary, etc.)
-- If asking about totals, add up all relevant information from different sections
-- Cite specific details when possible
-- If context is insufficient, clearly state what's missing
-- Understand nuances, implications, and logical inferences from the context
-- Provide abstractive summaries when requested, not just extractive quotes
-- You have access to tools for calculations, date operations, and text analysis - use them when needed
-- For mathematical calculations, use the calculator tool
-- For date-related questions (current date, current time, date differences), use the date_calculator tool
-- For text analysis tasks (word count, character count, extract data), use the text_analyzer tool
-- If the document context doesn't contain the answer and you have a relevant tool, use the tool instead
-
-Answer (use tools when appropriate):"""
+        # Fill the variable slots in the constant prompt template
+        prompt = _PROMPT_TMPL.format(ctx=context, entities=entities_info, q=question)
 
         try:
             rag_logger.debug("Starting Gemini content generation...")
@@ -98,7 +122,8 @@ Answer (use tools when appropriate):"""
                 # Streaming response with function calling
                 response_text = ""
                 response = self.model.generate_content(prompt, stream=True)
-                
+                self._tested = True
+
                 for chunk in response:
                     if chunk.text:
                         response_text += chunk.text
@@ -118,7 +143,8 @@ Answer (use tools when appropriate):"""
             else:
                 # Non-streaming response with function calling
                 response = self.model.generate_content(prompt)
-                
+                self._tested = True
+
                 # Handle function calls
                 if hasattr(response, 'candidates') and response.candidates:
                     candidate = response.candidates[0]
@@ -147,28 +173,42 @@ Answer (use tools when appropriate):"""
                     return "I couldn't generate a response. Please try rephrasing your question."
                 
         except Exception as e:
-            rag_logger.error(f"Gemini API Error: {str(e)}")
+            if not self._tested:
+                rag_logger.error(f"First Gemini query failed - check API key and connectivity: {str(e)}")
+            else:
+                rag_logger.error(f"Gemini API Error: {str(e)}")
             return f"Error processing with Gemini: {str(e)}"
     
+    # Entity scan bounds: only the leading slice of the context is
+    # scanned, and each type keeps at most five unique matches
+    _ENTITY_SCAN_LIMIT = 8192
+    _ENTITY_LIMIT = 5
+
     def _extract_context_entities(self, context: str) -> str:
         """Extract key entities and relationships from context for enhanced prompting"""
+        # Below a couple hundred chars the scan costs more than the
+        # entity hints are worth (tool-only queries, empty context)
+        if not context or len(context) < 200:
+            return ""
         try:
-            # Use simple regex patterns for key entity types
-            entities = {
-                'dates': re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', context),
-                'numbers': re.findall(r'\b\d+(?:\.\d+)?(?:%|\$|€|£)?\b', context),
-                'organizations': re.findall(r'\b[A-Z][a-z]+ (?:Inc|Corp|LLC|Ltd|Company|Organization)\b', context),
-                'proper_nouns': re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', context)
-            }
-            
-            # Filter and format entities
+            # Single pass with the precompiled combined pattern; dispatch
+            # each match to its entity type via lastgroup. Contexts are
+            # relevance-ordered, so scanning the leading slice is enough,
+            # and the scan stops once every type has its five unique hits
+            entities = {'dates': {}, 'organizations': {}, 'proper_nouns': {}, 'numbers': {}}
+            for match in _ENTITY_RE.finditer(context[:self._ENTITY_SCAN_LIMIT]):
+                bucket = entities[match.lastgroup]
+                if len(bucket) < self._ENTITY_LIMIT:
+                    bucket.setdefault(match.group())  # Insertion-ordered set
+                    if all(len(b) >= self._ENTITY_LIMIT for b in entities.values()):
+                        break
+
+            # Format the collected entities
             entity_summary = []
             for entity_type, items in entities.items():
                 if items:
-                    unique_items = list(set(items))[:5]  # Top 5 unique items
-                    if unique_items:
-                        entity_summary.append(f"{entity_type.title()}: {', '.join(unique_items)}")
-            
+                    entity_summary.append(f"{entity_type.title()}: {', '.join(items)}")
+
             if entity_summary:
                 return f"Key Entities Identified:\n{chr(10).join(entity_summary)}\n"
             return ""
@@ -1,38 +1,136 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 import time
 import uuid
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any
 from .analytics import analytics_engine, QueryMetrics
 
+# Resolved on first use: query_features lives in ml_analytics, whose
+# pandas/sklearn stack should not load just because the logger did
+_query_features = None
+
+def _get_query_features():
+    global _query_features
+    if _query_features is None:
+        from .ml_analytics import query_features
+        _query_features = query_features
+    return _query_features
+
+class _AppendFileHandler(logging.Handler):
+    """Log-file handler on a raw O_APPEND file descriptor
+
+    Skips the whole text-stream path (TextIOWrapper codec, libc buffer):
+    each record is formatted, UTF-8 encoded once, and appended to a
+    page-sized bytearray that goes out in a single os.write() when it
+    fills, on any WARNING-or-worse record, and at close. O_APPEND makes
+    the writes atomic even if another process holds the same file. Only
+    ever runs on the queue listener thread, so the buffer needs no lock
+    beyond the one logging.Handler already provides.
+    """
+
+    _BUF_SIZE = 4096
+
+    def __init__(self, path: str):
+        super().__init__()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._buf = bytearray()
+
+    def emit(self, record):
+        try:
+            self._buf += (self.format(record) + "\n").encode('utf-8', 'replace')
+            if len(self._buf) >= self._BUF_SIZE or record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buf and self._fd is not None:
+                os.write(self._fd, self._buf)
+                del self._buf[:]
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        super().close()
+
 class RAGLogger:
     def __init__(self):
         # Create logs directory
         os.makedirs('logs', exist_ok=True)
-        
+
         # Setup logger
         self.logger = logging.getLogger('RAG_Debug')
         self.logger.setLevel(logging.DEBUG)
-        
-        # File handler with UTF-8 encoding
+
+        # File handler writing UTF-8 through a raw appending fd
         log_file = f"logs/rag_debug_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = _AppendFileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
-        
+
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        
+
         # Formatter
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
-        
-        # Add handlers
+
+        # Add handlers. Callers only enqueue the record and return;
+        # formatting and the actual write() happen on the listener
+        # thread, so query-path logging never blocks on disk
         if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            log_queue = queue.Queue(-1)
+            self._listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler,
+                respect_handler_level=True)
+            self._listener.start()
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            atexit.register(self._listener.stop)
+
+        # Query metrics are buffered and written in grouped transactions
+        # by a background thread, so the query path never pays the
+        # per-row commit. Flushed every 250 ms, when the batch fills,
+        # and at exit
+        self._pending_metrics = deque()
+        self._metrics_event = threading.Event()
+        self._metrics_thread = threading.Thread(
+            target=self._drain_metrics, daemon=True, name='rag-metrics-flush')
+        self._metrics_thread.start()
+        atexit.register(self.flush_metrics)
+        # Feedback updates target rows that may still be sitting in this
+        # buffer; let the analytics engine force a flush before they run
+        analytics_engine.register_metrics_flush(self.flush_metrics)
+
+    _METRICS_FLUSH_INTERVAL = 0.25
+    _METRICS_FLUSH_BATCH = 100
+
+    def _drain_metrics(self):
+        while True:
+            self._metrics_event.wait(self._METRICS_FLUSH_INTERVAL)
+            self._metrics_event.clear()
+            self.flush_metrics()
+
+    def flush_metrics(self):
+        """Write all buffered query metrics in one transaction"""
+        if not self._pending_metrics:
+            return
+        batch = []
+        while self._pending_metrics:
+            batch.append(self._pending_metrics.popleft())
+        analytics_engine.log_queries(batch)
     
     def debug(self, msg):
         self.logger.debug(msg)
@@ -62,6 +160,15 @@ class RAGLogger:
                           generation_time: float, total_time: float, sources: list,
                           search_distances: list):
         """Log complete query metrics"""
+        # Feature columns are computed once here so analytics can reduce
+        # over them instead of re-scoring historical text every refresh
+        try:
+            q_word_count, r_length, r_sentiment, r_coherence = \
+                _get_query_features()(question, response)
+        except Exception as e:
+            self.debug(f"Query feature computation failed: {e}")
+            q_word_count = r_length = r_sentiment = r_coherence = None
+
         metrics = QueryMetrics(
             query_id=query_id,
             timestamp=datetime.now(),
@@ -73,10 +180,16 @@ class RAGLogger:
             generation_time=generation_time,
             total_time=total_time,
             sources=sources,
-            search_distances=search_distances
+            search_distances=search_distances,
+            q_word_count=q_word_count,
+            r_length=r_length,
+            r_sentiment=r_sentiment,
+            r_coherence=r_coherence
         )
         
-        analytics_engine.log_query(metrics)
+        self._pending_metrics.append(metrics)
+        if len(self._pending_metrics) >= self._METRICS_FLUSH_BATCH:
+            self._metrics_event.set()
         self.info(f"Query completed: {query_id} - Time: {total_time:.2f}s, Context: {context_length} chars")
     
     def log_document_processed(self, doc_id: str, filename: str, file_size: int,
@@ -1,28 +1,71 @@
 import gc
+import numpy as np
 import psutil
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 import weakref
 from .logger import rag_logger
 
 class MemoryManager:
-    """Manages memory usage and model loading/unloading"""
-    
+    """Manages memory usage and model loading/unloading
+
+    Model bookkeeping is laid out as parallel arrays (names, sizes,
+    last-used stamps, objects) rather than per-model dicts: totals and
+    LRU picks become single numpy reductions instead of Python loops.
+    """
+
     def __init__(self, max_memory_mb: int = 2048):
         self.max_memory_mb = max_memory_mb
-        self.loaded_models = {}
-        self.model_refs = weakref.WeakValueDictionary()
-        
+        self._names: list = []
+        # Weak references only: the model's owner controls its lifetime,
+        # and a finalizer drops our entry the moment the object is
+        # collected - no parallel strong dict that could pin it, and no
+        # manual scans for dead entries
+        self._refs: list = []
+        self._finalizers: Dict[str, weakref.finalize] = {}
+        self._sizes = np.zeros(0, dtype=np.float32)
+        self._last_used = np.zeros(0, dtype=np.float64)
+        # One Process handle for the lifetime of the manager; creating
+        # it re-reads process metadata on every call otherwise
+        self._proc = psutil.Process(os.getpid())
+        self._mem_cached_at = 0.0
+        self._mem_cache: Optional[Dict[str, float]] = None
+
+    # Memory readings are served from a short-lived cache: pressure
+    # checks cluster around model load/unload bursts where re-reading
+    # /proc per call is pure overhead
+    _MEM_CACHE_TTL = 0.1
+
+    @property
+    def loaded_models(self) -> Tuple[str, ...]:
+        """Names of the currently registered models"""
+        return tuple(self._names)
+
+    def total_registered_mb(self) -> float:
+        """Registered model footprint in one vector reduction"""
+        return float(self._sizes.sum())
+
+    def lru_model(self) -> Optional[str]:
+        """Name of the least recently used model, if any"""
+        if not self._names:
+            return None
+        return self._names[int(np.argmin(self._last_used))]
+
     def get_memory_usage(self) -> Dict[str, float]:
-        """Get current memory usage"""
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
-        
-        return {
+        """Get current memory usage (cached for a fraction of a second)"""
+        now = time.monotonic()
+        if self._mem_cache is not None and now - self._mem_cached_at < self._MEM_CACHE_TTL:
+            return self._mem_cache
+
+        memory_info = self._proc.memory_info()
+        self._mem_cache = {
             'rss_mb': memory_info.rss / 1024 / 1024,
             'vms_mb': memory_info.vms / 1024 / 1024,
-            'percent': process.memory_percent()
+            'percent': self._proc.memory_percent()
         }
+        self._mem_cached_at = now
+        return self._mem_cache
     
     def should_unload_models(self) -> bool:
         """Check if models should be unloaded due to memory pressure"""
@@ -31,50 +74,67 @@ class MemoryManager:
     
     def register_model(self, model_name: str, model_obj: Any, size_mb: float = 0):
         """Register a model for memory tracking"""
-        self.loaded_models[model_name] = {
-            'object': model_obj,
-            'size_mb': size_mb,
-            'last_used': 0
-        }
-        self.model_refs[model_name] = model_obj
-        
+        if model_name in self._names:
+            self.unload_model(model_name)
+        self._names.append(model_name)
+        self._refs.append(weakref.ref(model_obj))
+        self._sizes = np.append(self._sizes, np.float32(size_mb))
+        self._last_used = np.append(self._last_used, 0.0)
+        self._finalizers[model_name] = weakref.finalize(
+            model_obj, self._on_model_gc, model_name)
+
         memory = self.get_memory_usage()
         rag_logger.info(f"Model '{model_name}' loaded. Memory: {memory['rss_mb']:.1f}MB")
-    
+
+    def _on_model_gc(self, model_name: str):
+        """Finalizer: drop the entry for a model that was collected"""
+        self._finalizers.pop(model_name, None)
+        self._drop_entry(model_name)
+        rag_logger.debug(f"Model '{model_name}' garbage collected, entry removed")
+
+    def _drop_entry(self, model_name: str) -> bool:
+        if model_name not in self._names:
+            return False
+        index = self._names.index(model_name)
+        del self._names[index]
+        del self._refs[index]
+        self._sizes = np.delete(self._sizes, index)
+        self._last_used = np.delete(self._last_used, index)
+        return True
+
     def unload_model(self, model_name: str):
         """Unload a specific model"""
-        if model_name in self.loaded_models:
-            model_info = self.loaded_models[model_name]
-            del model_info['object']
-            del self.loaded_models[model_name]
-            
-            if model_name in self.model_refs:
-                del self.model_refs[model_name]
-            
+        finalizer = self._finalizers.pop(model_name, None)
+        if finalizer is not None:
+            finalizer.detach()
+        if self._drop_entry(model_name):
             gc.collect()
             memory = self.get_memory_usage()
             rag_logger.info(f"Model '{model_name}' unloaded. Memory: {memory['rss_mb']:.1f}MB")
-    
+
     def cleanup_unused_models(self):
-        """Clean up models that are no longer referenced"""
-        to_remove = []
-        for model_name in self.loaded_models:
-            if model_name not in self.model_refs:
-                to_remove.append(model_name)
-        
-        for model_name in to_remove:
+        """Defensive sweep for entries whose weak reference has died
+
+        Normally the finalizers remove entries as soon as the model is
+        collected, so this finds nothing; kept for callers that want an
+        explicit sweep point.
+        """
+        for model_name in [name for name, ref in zip(self._names, self._refs)
+                           if ref() is None]:
             self.unload_model(model_name)
-    
+
     def force_cleanup(self):
         """Force cleanup of all models and memory"""
-        model_names = list(self.loaded_models.keys())
-        for model_name in model_names:
+        for model_name in list(self._names):
             self.unload_model(model_name)
         
-        # Aggressive cleanup
-        gc.collect()
-        gc.collect()  # Call twice for better cleanup
-        
+        # One full-generation pass; a second collect walks the same
+        # (now empty) generations again for nothing, and each pass can
+        # pause for a long time with large ML objects resident
+        gc.collect(2)
+
+        # Report post-collect numbers, not a cached pre-collect reading
+        self._mem_cache = None
         memory = self.get_memory_usage()
         rag_logger.info(f"Force cleanup completed. Memory: {memory['rss_mb']:.1f}MB")
 
@@ -40,6 +40,14 @@ class RAGEngine:
         for doc in documents:
             rag_logger.info(f"Document: {doc['filename']} ({doc['chunk_count']} chunks)")
         self.vector_store.add_documents(documents)
+
+        # NLP fallback: run sentence splitting, keyword extraction and
+        # NER per chunk once now, so queries read precomputed columns
+        # instead of repeating that work per question
+        if not self.using_gemini:
+            for doc in documents:
+                for chunk in doc['chunks']:
+                    self.processor.preprocess_chunk(chunk)
     
     def query(self, question: str, documents: List[Dict] = None) -> Tuple[str, List[str], str]:
         """Query the RAG system with comprehensive metrics tracking"""
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the one-shot query_metrics schema migration
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analytics import AnalyticsEngine, decode_distances, decode_sources, to_epoch_us
+
+LEGACY_DDL = '''
+    CREATE TABLE query_metrics (
+        query_id TEXT PRIMARY KEY,
+        timestamp DATETIME,
+        question TEXT,
+        response TEXT,
+        context_length INTEGER,
+        chunk_count INTEGER,
+        search_time REAL,
+        generation_time REAL,
+        total_time REAL,
+        sources TEXT,
+        search_distances TEXT,
+        user_rating INTEGER,
+        feedback TEXT
+    )
+'''
+
+def _make_legacy_db(db_path, rows):
+    """Create a pre-migration database with ISO timestamps and JSON columns"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(LEGACY_DDL)
+    conn.executemany('''
+        INSERT INTO query_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+def test_migration_round_trip():
+    """Legacy ISO-timestamp DB in, epoch-us STRICT table out, rows intact"""
+    timestamps = [
+        datetime(2024, 1, 15, 9, 30, 0),
+        datetime(2024, 6, 1, 23, 59, 59, 500000),
+        datetime(2025, 12, 31, 0, 0, 1),
+    ]
+    rows = [
+        (f"legacy-{i}", ts.isoformat(sep=' '), f"question {i}", f"response {i}",
+         1200 + i, 5, 0.5 + i, 1.5, 2.0 + i,
+         '["doc_a.pdf", "doc_b.txt"]', '[0.12, 0.34, 0.56]', 4, None)
+        for i, ts in enumerate(timestamps)
+    ]
+
+    db_path = os.path.join(tempfile.mkdtemp(), "analytics.db")
+    _make_legacy_db(db_path, rows)
+
+    engine = AnalyticsEngine(db_path=db_path)
+    with engine.cursor() as cursor:
+        # Schema: timestamp rebuilt as INTEGER in a STRICT table
+        type_row = cursor.execute(
+            "SELECT type FROM pragma_table_info('query_metrics') WHERE name = 'timestamp'"
+        ).fetchone()
+        assert type_row[0] == 'INTEGER', "Timestamp column should be INTEGER after migration"
+        ddl = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'query_metrics'"
+        ).fetchone()[0]
+        assert 'STRICT' in ddl, "Migrated table should be STRICT"
+
+        migrated = cursor.execute(
+            "SELECT * FROM query_metrics ORDER BY query_id"
+        ).fetchall()
+
+    assert len(migrated) == len(rows), "Every legacy row should be copied across"
+    for row, ts in zip(migrated, timestamps):
+        # julianday round-trips through a double, so allow sub-ms slack
+        assert abs(row['timestamp'] - to_epoch_us(ts)) < 1000, \
+            f"Timestamp should convert to epoch microseconds ({row['query_id']})"
+        assert decode_sources(row['sources']) == ["doc_a.pdf", "doc_b.txt"], \
+            "Legacy JSON sources should stay decodable"
+        decoded = decode_distances(row['search_distances'])
+        assert [round(d, 2) for d in decoded] == [0.12, 0.34, 0.56], \
+            "Legacy distances should stay decodable after the BLOB cast"
+
+    # Migration must be one-shot: a second engine sees INTEGER and skips it
+    with AnalyticsEngine(db_path=db_path).cursor() as cursor:
+        count = cursor.execute("SELECT COUNT(*) FROM query_metrics").fetchone()[0]
+    assert count == len(rows), "Re-opening the DB should not duplicate or drop rows"
+
+    print("[PASS] Migration round-trip test")
+
+def test_fresh_db_skips_migration():
+    """A database created on the new schema initializes cleanly"""
+    db_path = os.path.join(tempfile.mkdtemp(), "analytics.db")
+    engine = AnalyticsEngine(db_path=db_path)
+    with engine.cursor() as cursor:
+        type_row = cursor.execute(
+            "SELECT type FROM pragma_table_info('query_metrics') WHERE name = 'timestamp'"
+        ).fetchone()
+    assert type_row[0] == 'INTEGER'
+    print("[PASS] Fresh DB test")
+
+if __name__ == "__main__":
+    test_migration_round_trip()
+    test_fresh_db_skips_migration()
+    print("All analytics migration tests passed!")
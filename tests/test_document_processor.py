@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the streaming chunker against the original whole-text algorithm
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.document_processor import DocumentProcessor
+
+def _reference_chunks(text, chunk_size=800, overlap=150):
+    """The original whole-text chunker, kept here as the parity oracle"""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            # Break at a sentence ending near the chunk boundary
+            for i in range(end, max(start + chunk_size - 100, start), -1):
+                if i < len(text) and text[i] in '.!?':
+                    end = i + 1
+                    break
+        chunk = ' '.join(text[start:end].strip().split())
+        if chunk and len(chunk) > 50:
+            chunks.append(chunk)
+        start = end - overlap
+        if start >= len(text):
+            break
+    return chunks
+
+def _random_pieces(rng):
+    """Paragraph pieces the way the extractors yield them (newline-terminated)"""
+    words = ['alpha', 'beta', 'gamma', 'delta', 'analysis', 'report',
+             'value', 'system', 'metric', 'result']
+    pieces = []
+    for _ in range(rng.randint(1, 12)):
+        sentences = [' '.join(rng.choices(words, k=rng.randint(3, 14))) + rng.choice('.!?')
+                     for _ in range(rng.randint(1, 8))]
+        pieces.append(' '.join(sentences) + "\n")
+    return pieces
+
+def test_chunker_parity():
+    """Streamed chunks must match the whole-text algorithm exactly"""
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    rng = random.Random(42)
+
+    for trial in range(200):
+        pieces = _random_pieces(rng)
+        # The original pipeline chunked the stripped full text
+        text = ''.join(pieces).strip()
+
+        streamed, full_text = processor._create_chunks(iter(pieces))
+
+        assert full_text == text, f"Full text should round-trip (trial {trial})"
+        assert streamed == _reference_chunks(text), \
+            f"Streamed chunks should match the whole-text chunker (trial {trial})"
+
+    print("[PASS] Chunker parity test")
+
+def test_chunker_small_document():
+    """A document under one chunk size is returned verbatim"""
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    chunks, full_text = processor._create_chunks(iter(["Short document text.\n"]))
+    assert chunks == ["Short document text."]
+    assert full_text == "Short document text."
+    print("[PASS] Small document test")
+
+def test_chunker_small_doc_trailing_newline():
+    """Raw pieces just over chunk_size that strip down under it stay one chunk"""
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    text = 'Q' * 800
+    chunks, full_text = processor._create_chunks(iter([text + "\n"]))
+    assert full_text == text
+    assert chunks == [text], "No duplicated overlap tail chunk should be emitted"
+    print("[PASS] Small document with trailing newline test")
+
+if __name__ == "__main__":
+    test_chunker_parity()
+    test_chunker_small_document()
+    test_chunker_small_doc_trailing_newline()
+    print("All document processor tests passed!")